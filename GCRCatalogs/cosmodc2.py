@@ -186,12 +186,19 @@ class CosmoDC2ParentClass(BaseGenericCatalog):
                                check_file_list_complete=True, **kwargs):
 
         healpix_files = dict()
-        fname_pattern = catalog_filename_template.format(r'(\d)', r'(\d)', r'(\d+)')
-        for f in sorted(os.listdir(catalog_root_dir)):
-            m = re.match(fname_pattern, f)
-            if m is None:
-                continue
-
+        fname_re = re.compile(catalog_filename_template.format(r'(\d)', r'(\d)', r'(\d+)'))
+        if healpix_pixels is not None:
+            healpix_pixels = set(healpix_pixels)
+
+        matched = list()
+        with os.scandir(catalog_root_dir) as it:
+            for entry in it:
+                m = fname_re.match(entry.name)
+                if m is not None:
+                    matched.append((entry, m))
+
+        # only sort the (much smaller) set of matching file names
+        for entry, m in sorted(matched, key=lambda em: em[0].name):
             zlo_this, zhi_this, hpx_this = tuple(map(int, m.groups()))
 
             # check if this file is needed
@@ -200,15 +207,15 @@ class CosmoDC2ParentClass(BaseGenericCatalog):
                 (healpix_pixels is not None and hpx_this not in healpix_pixels)):
                 continue
 
-            healpix_files[(zlo_this, hpx_this)] = os.path.join(catalog_root_dir, f)
+            healpix_files[(zlo_this, hpx_this)] = entry.path
 
         if check_file_list_complete:
             if zlo is None:
                 zlo = min(z for z, _ in healpix_files)
             if zhi is None:
                 zhi = max(z for z, _ in healpix_files) + 1
-            possible_hpx = list(set(hpx for _, hpx in healpix_files)) if healpix_pixels is None else healpix_pixels
-            if not all(key in healpix_files for key in product(range(zlo, zhi), possible_hpx)):
+            possible_hpx = {hpx for _, hpx in healpix_files} if healpix_pixels is None else healpix_pixels
+            if not healpix_files.keys() >= set(product(range(zlo, zhi), possible_hpx)):
                 raise ValueError('Some catalog files are missing!')
 
         return healpix_files
@@ -6,6 +6,8 @@ as extracted and reformatted as Parquet files.
 Readers that provide access to DC2 DM data should inherit from this class.
 """
 
+import concurrent.futures
+import functools
 import math
 import os
 import re
@@ -20,6 +22,28 @@ from .utils import first, is_string_like
 
 __all__ = ['DC2DMCatalog', 'DC2DMTractCatalog', 'DC2DMVisitCatalog']
 
+_TRACT_RE = re.compile(r'tract_?(\d+)')
+_VISIT_RE = re.compile(r'visit_?(\d+)')
+
+# libyaml-backed safe loader when available; same results as yaml.safe_load
+_YAML_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# AB mag = 8.90 is 1 Jansky; 2.5 * 9 more for nano = 10**(-9)
+_NANOJANSKY_PER_FLUXMAG0 = 10**((2.5 * 9 + 8.90) / 2.5)
+
+# rows per block in create_basic_flag_mask (64 kB of output per block)
+_FLAG_MASK_BLOCK_SIZE = 1 << 16
+
+
+@functools.lru_cache(maxsize=None)
+def _load_meta_yaml(meta_path):
+    """Parse a quantity metadata yaml file once per path.
+
+    The returned dict is shared; callers must not modify it.
+    """
+    with open(meta_path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_SAFE_LOADER)
+
 
 #pylint: disable=C0103
 def convert_flux_to_mag(flux, fluxmag0):
@@ -61,13 +85,13 @@ def convert_flux_to_nanoJansky(flux, fluxmag0):
     Based on the given fluxmag0 value, which is AB mag = 0.
     Eventually we will get nJy from the final calibrated DRP processing.
     """
-    #pylint: disable=C0103
-    AB_mag_zp_wrt_Jansky = 8.90  # Definition of AB
-    # 9 is from nano=10**(-9)
-    #pylint: disable=C0103
-    AB_mag_zp_wrt_nanoJansky = 2.5 * 9 + AB_mag_zp_wrt_Jansky
-
-    return 10**((AB_mag_zp_wrt_nanoJansky)/2.5) * flux / fluxmag0
+    # fold the constant into fluxmag0 first so a scalar fluxmag0 costs a single array pass
+    scale = _NANOJANSKY_PER_FLUXMAG0 / fluxmag0
+    # keep float32 fluxes in float32 rather than upcasting through a float64 fluxmag0
+    flux_dtype = getattr(flux, 'dtype', None)
+    if flux_dtype is not None and flux_dtype.kind == 'f':
+        scale = np.asarray(scale, dtype=flux_dtype)
+    return flux * scale
 
 
 def create_basic_flag_mask(*flags):
@@ -82,13 +106,74 @@ def create_basic_flag_mask(*flags):
         The combined mask array
     """
 
-    out = np.ones(len(flags[0]), bool)
-    for flag in flags:
-        out &= (~flag)
+    # Work through the rows in cache-sized blocks, so that each block of the
+    # output is OR-ed with every flag while it is still in cache
+    n = len(flags[0])
+    out = np.empty(n, dtype=bool)
+    for start in range(0, n, _FLAG_MASK_BLOCK_SIZE):
+        block = slice(start, start + _FLAG_MASK_BLOCK_SIZE)
+        out_block = out[block]
+        if len(flags) == 1:
+            np.logical_not(flags[0][block], out=out_block)
+            continue
+        np.logical_or(flags[0][block], flags[1][block], out=out_block)
+        for flag in flags[2:]:
+            np.logical_or(out_block, flag[block], out=out_block)
+        np.logical_not(out_block, out=out_block)
 
     return out
 
 
+class _PrefetchingDataset():
+    """
+    Stand-in for a ParquetFileWrapper yielded by DC2DMCatalog._iter_native_dataset.
+
+    A `read_columns` call starts the same read on the datasets in `following`
+    in a background thread, so that they are read while this one is processed.
+    A later `read_columns` call with the same arguments is answered from that
+    read; anything else is passed through to the wrapped dataset.
+    """
+    def __init__(self, dataset, executor):
+        self._dataset = dataset
+        self._executor = executor
+        self._prefetched = None  # (args, kwargs, future)
+        self.following = []
+
+    def __getattr__(self, name):
+        if name == '_dataset':
+            raise AttributeError(name)
+        return getattr(self._dataset, name)
+
+    def __len__(self):
+        return len(self._dataset)
+
+    def __contains__(self, item):
+        return item in self._dataset
+
+    def _prefetch(self, args, kwargs):
+        if self._prefetched is None:
+            future = self._executor.submit(self._dataset.read_columns, *args, **kwargs)
+            self._prefetched = (args, kwargs, future)
+
+    def release(self):
+        """Drop a background read that has not been used"""
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None and not prefetched[2].cancel():
+            # do not let a stale read run concurrently with a new one on the same file
+            concurrent.futures.wait([prefetched[2]])
+
+    def read_columns(self, *args, **kwargs):
+        for dataset in self.following:
+            dataset._prefetch(args, kwargs)  # pylint: disable=protected-access
+        if self._prefetched is not None:
+            prefetched_args, prefetched_kwargs, future = self._prefetched
+            if prefetched_args == args and prefetched_kwargs == kwargs:
+                self._prefetched = None
+                return future.result()
+            self.release()
+        return self._dataset.read_columns(*args, **kwargs)
+
+
 class DC2DMCatalog(BaseGenericCatalog):
     r"""DC2 Catalog reader
 
@@ -108,6 +193,7 @@ class DC2DMCatalog(BaseGenericCatalog):
     FILE_PATTERN = r'.+\.parquet$'
     META_PATH = None
     _default_pixel_scale = None
+    _prefetch_depth = 1  # number of datasets read ahead in a background thread
 
     def _subclass_init(self, **kwargs):
         self.base_dir = kwargs['base_dir']
@@ -190,8 +276,7 @@ class DC2DMCatalog(BaseGenericCatalog):
                 {<homonogized value (str)>: {<meta value (str)>: <meta data>}, ...}
         """
 
-        with open(meta_path, 'r') as f:
-            base_dict = yaml.safe_load(f)
+        base_dict = _load_meta_yaml(meta_path)
 
         info_dict = dict()
         for q, info in base_dict.items():
@@ -204,7 +289,7 @@ class DC2DMCatalog(BaseGenericCatalog):
                         k: v.replace("<band>", band) if is_string_like(v) else v for k, v in info.items()
                     }
             else:
-                info_dict[q] = info
+                info_dict[q] = dict(info)
 
         return info_dict
 
@@ -246,14 +331,14 @@ class DC2DMCatalog(BaseGenericCatalog):
             for all files and keys
         """
         datasets = list()
-        for fname in os.listdir(self.base_dir):
-            if not self._filename_re.match(fname):
-                continue
-            info = self._extract_dataset_info(fname)
-            if info is False:
-                continue
-            file_path = os.path.join(self.base_dir, fname)
-            datasets.append(ParquetFileWrapper(file_path, info))
+        with os.scandir(self.base_dir) as it:
+            for entry in it:
+                if not self._filename_re.match(entry.name):
+                    continue
+                info = self._extract_dataset_info(entry.name)
+                if info is False:
+                    continue
+                datasets.append(ParquetFileWrapper(entry.path, info))
 
         return self._sort_datasets(datasets)
 
@@ -267,20 +352,38 @@ class DC2DMCatalog(BaseGenericCatalog):
         Overloading this so that we can query the database backend
         for multiple columns at once
         """
-        return native_quantity_getter.read_columns(list(native_quantities_needed),
+        return native_quantity_getter.read_columns(sorted(native_quantities_needed),
                                                    as_dict=True)
 
     def _iter_native_dataset(self, native_filters=None):
-        for dataset in self._datasets:
-            if (native_filters is not None and
-                    not native_filters.check_scalar(dataset.info)):
-                continue
-            yield dataset
+        datasets = [
+            dataset for dataset in self._datasets
+            if native_filters is None or native_filters.check_scalar(dataset.info)
+        ]
+        if self._prefetch_depth < 1 or len(datasets) < 2:
+            yield from datasets
+            return
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        wrapped = [_PrefetchingDataset(dataset, executor) for dataset in datasets]
+        try:
+            for i, dataset in enumerate(wrapped):
+                dataset.following = wrapped[i+1:i+1+self._prefetch_depth]
+                yield dataset
+                dataset.release()
+        finally:
+            # also when the iterator is closed early: drop any read ahead
+            for dataset in wrapped:
+                dataset.release()
+            executor.shutdown(wait=True)
 
     def __len__(self):
         if self._len is None:
-            # pylint: disable=attribute-defined-outside-init
-            self._len = sum(len(dataset) for dataset in self._datasets)
+            # each len() parses one file footer; overlap them, as they are I/O bound
+            max_workers = min(32, len(self._datasets))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # pylint: disable=attribute-defined-outside-init
+                self._len = sum(executor.map(len, self._datasets))
         return self._len
 
     def close_all_file_handles(self):
@@ -304,7 +407,7 @@ class DC2DMTractCatalog(DC2DMCatalog):
         super()._subclass_init(**kwargs)
 
     def _extract_dataset_info(self, filename):
-        match = re.search(r'tract_?(\d+)', filename)
+        match = _TRACT_RE.search(filename)
         if match is None:
             warnings.warn('Filename {} does not contain tract info or not in correct format. Skipped')
             return False
@@ -343,7 +446,7 @@ class DC2DMVisitCatalog(DC2DMCatalog):
         super()._subclass_init(**kwargs)
 
     def _extract_dataset_info(self, filename):
-        match = re.search(r'visit_?(\d+)', filename)
+        match = _VISIT_RE.search(filename)
         if match is None:
             warnings.warn('Filename {} does not contain visit info or not in correct format. Skipped')
             return False
@@ -27,13 +27,14 @@ def _get_galaxy_mask(is_star, is_matched):
 def _get_star_mask(is_star, is_matched):
     return is_star & is_matched
 
+# the match masks select rows; a MaskedArray hides the rows where its mask is True
 def _get_galaxy_array(q, is_star, is_matched):
     mask = _get_galaxy_mask(is_star, is_matched)
-    return ma.MaskedArray(q, mask=mask)
+    return ma.MaskedArray(q, mask=~mask)
 
 def _get_star_array(q, is_star, is_matched):
     mask = _get_star_mask(is_star, is_matched)
-    return ma.MaskedArray(q, mask=mask)
+    return ma.MaskedArray(q, mask=~mask)
 
 class DC2MatchedTable(BaseGenericCatalog):
 
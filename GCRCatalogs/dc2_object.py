@@ -2,6 +2,7 @@
 DC2 Object Catalog Reader
 """
 
+import math
 import os
 import re
 import warnings
@@ -15,6 +16,8 @@ from GCR import BaseGenericCatalog
 
 from .dc2_dm_catalog import DC2DMTractCatalog
 from .dc2_dm_catalog import convert_flux_to_mag, convert_flux_to_nanoJansky, convert_nanoJansky_to_mag, convert_flux_err_to_mag_err
+from .dc2_dm_catalog import create_basic_flag_mask
+from .dc2_dm_catalog import _YAML_SAFE_LOADER
 from .utils import decode
 
 __all__ = ['DC2ObjectCatalog', 'DC2ObjectParquetCatalog']
@@ -58,25 +61,6 @@ def convert_dm_ref_zp_flux_to_nanoJansky(flux, dm_ref_zp=27):
     return calibrated_flux_to_nanoJansky * flux
 
 
-def create_basic_flag_mask(*flags):
-    """Generate a mask for a set of flags
-
-    For each item the mask will be true if and only if all flags are false
-
-    Args:
-        *flags (ndarray): Variable number of arrays with booleans or equivalent
-
-    Returns:
-        The combined mask array
-    """
-
-    out = np.ones(len(flags[0]), bool)
-    for flag in flags:
-        out &= (~flag)
-
-    return out
-
-
 class TableWrapper():
     """Wrapper class for pandas HDF5 storer
 
@@ -88,6 +72,7 @@ class TableWrapper():
     """
 
     _default_values = {'i': -1, 'b': False, 'U': ''}
+    _dtype_interner = {}
 
     def __init__(self, file_handle, key, schema=None):
         if not file_handle.is_open:
@@ -101,9 +86,15 @@ class TableWrapper():
 
         self._schema = {} if schema is None else dict(schema)
         self._native_schema = None
-        self._len = None
         self._cache = None
+        self._block_index = None
         self._constant_arrays = dict()
+        # the number of rows never changes for a read-only file,
+        # so read it once while the group node is at hand
+        if self.is_table:
+            self._len = self.storer.table.nrows
+        else:
+            self._len = self.storer.group.axis1.nrows
 
     @property
     def native_schema(self):
@@ -121,21 +112,24 @@ class TableWrapper():
             else:
                 for i in range(self.storer.nblocks):
                     dtype = getattr(self.storer.group, 'block{}_values'.format(i)).dtype.name
-                    for col in getattr(self.storer.group, 'block{}_items'.format(i)):
-                        self._native_schema[decode(col)] = {'dtype': dtype}
+                    for col in self._read_block_items(i):
+                        self._native_schema[col] = {'dtype': dtype}
         return self._native_schema
 
+    def _read_block_items(self, i):
+        """Return the column names of block `i` of a 'fixed' formatted group
+
+        The items node is read in one go; iterating over the node
+        itself would fetch the names from the file one at a time.
+        """
+        return [decode(col) for col in getattr(self.storer.group, 'block{}_items'.format(i)).read().tolist()]
+
     @property
     def columns(self):
         """Get columns from either 'fixed' or 'table' formatted HDF5 files."""
         return set(self.native_schema)
 
     def __len__(self):
-        if self._len is None:
-            if self.is_table:
-                self._len = self.storer.nrows
-            else:
-                self._len = self.storer.group.axis1.nrows
         return self._len
 
     def __contains__(self, item):
@@ -146,16 +140,72 @@ class TableWrapper():
 
         Uses cached values, if available.
         """
-        if self._cache is None:
-            self._cache = self.storer.read()
+        if not self.is_table:
+            return self._get_fixed_format_column(key)
 
+        self._load_table_columns((key,))
         try:
-            return self._cache[key].values
+            return self._cache[key]
         except KeyError:
             return self._get_constant_array(key)
 
     get = __getitem__
 
+    def read_columns(self, columns):
+        """Return a dict of the values of the columns in `columns`
+
+        For the 'table' format, all columns that are not cached yet
+        are read in a single pass over the table.
+        """
+        if self.is_table:
+            self._load_table_columns(columns)
+        return {col: self[col] for col in columns}
+
+    def _load_table_columns(self, columns):
+        """Read and cache the given columns of a 'table' formatted group"""
+        if self._cache is None:
+            self._cache = {}
+        missing = [col for col in columns if col not in self._cache and col in self.native_schema]
+        if missing:
+            df = self.storer.read(columns=missing)
+            self._cache.update((col, df[col].values) for col in missing)
+
+    def _get_fixed_format_column(self, key):
+        """Return a column of a 'fixed' formatted group
+
+        storer.read() would read every block and then concatenate and copy
+        them into a new DataFrame. Here only the block holding `key` is read,
+        and each of its columns is cached as a view into it.
+        """
+        if self._cache is None:
+            self._cache = {}
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        if self._block_index is None:
+            self._block_index = {}
+            for i in range(self.storer.nblocks):
+                for col in self._read_block_items(i):
+                    self._block_index[col] = i
+
+        if key not in self._block_index:
+            return self._get_constant_array(key)
+
+        i = self._block_index[key]
+        items = self.storer.read_index('block{}_items'.format(i))
+        values = self.storer.read_array('block{}_values'.format(i))
+        if isinstance(values, np.ndarray):
+            # pandas may store the block transposed; make each column contiguous
+            values = np.ascontiguousarray(values)
+            # the block is (n_items, n_rows), so each row is one column
+            self._cache.update(zip(items, values))
+        else:
+            # extension arrays (e.g. strings) come back 1-d, holding a single column
+            self._cache[items[0]] = np.asarray(values)
+        return self._cache[key]
+
     @classmethod
     def _get_default_value(cls, dtype, key=None):  # pylint: disable=W0613
         return cls._default_values.get(np.dtype(dtype).kind, np.nan)
@@ -179,19 +229,26 @@ class TableWrapper():
         Actually generate a constant array according to `dtype` and `value`
         """
         dtype = np.dtype(dtype)
+        # one dtype object per dtype.str however it was spelled ('f8', float, ...),
+        # so that its id can key the cache; structured dtypes may share a str
+        dtype = self._dtype_interner.setdefault(dtype.str if dtype.fields is None else dtype, dtype)
+        # NaN never compares equal to itself, so normalize it to the same object
+        if isinstance(value, float) and math.isnan(value):
+            value = np.nan
         # here `key` is used to cache the constant array
         # has nothing to do with column name
-        key = (dtype.str, value)
+        # interned dtype objects live on the class, so their ids are stable
+        key = (id(dtype), value)
         if key not in self._constant_arrays:
-            self._constant_arrays[key] = np.asarray(np.repeat(value, len(self)), dtype=dtype)
-            self._constant_arrays[key].setflags(write=False)
+            # a read-only, zero-stride view; no per-row storage is allocated
+            self._constant_arrays[key] = np.broadcast_to(np.asarray(value, dtype=dtype), (len(self),))
         return self._constant_arrays[key]
 
     def clear_cache(self):
         """
         clear cached data
         """
-        self._native_schema = self._len = self._cache = None
+        self._native_schema = self._cache = None
         self._constant_arrays.clear()
 
 
@@ -277,6 +334,13 @@ class DC2ObjectCatalog(BaseGenericCatalog):
             err_msg = 'No catalogs were found in `base_dir` {}'
             raise RuntimeError(err_msg.format(self.base_dir))
 
+        # tract and patch of every dataset, so that native filters
+        # can be evaluated on all datasets at once
+        self._tracts_and_patches = {
+            'tract': np.array([dataset.tract for dataset in self._datasets]),
+            'patch': np.array([dataset.patch for dataset in self._datasets]),
+        }
+
         if not self._schema:
             warnings.warn('Falling back to reading all datafiles for column names')
             self._schema = self._generate_schema_from_datafiles(self._datasets)
@@ -290,18 +354,29 @@ class DC2ObjectCatalog(BaseGenericCatalog):
             # A slightly crude way of checking for version of schema to have modelfit mag
             # A future improvement will be to explicitly store version information in the datasets
             # and just rely on that versioning.
-            has_modelfit_mag = any(col.endswith('_modelfit_mag') for col in self._schema)
-            has_modelfit_flux = any('_modelfit_CModel_' in col for col in self._schema)
-            has_modelfit_flag = any(col.endswith('_modelfit_CModel_flag') for col in self._schema)
+            # Scan the schema once for all the column patterns we need
+            has_modelfit_mag = has_modelfit_flux = has_modelfit_flag = False
+            has_flux_sigma = has_flux_err = False
+            for col in self._schema:
+                if col.endswith('_modelfit_mag'):
+                    has_modelfit_mag = True
+                if '_modelfit_CModel_' in col:
+                    has_modelfit_flux = True
+                    if col.endswith('_modelfit_CModel_flag'):
+                        has_modelfit_flag = True
+                if col.endswith('_fluxSigma'):
+                    has_flux_sigma = True
+                elif col.endswith('_fluxErr'):
+                    has_flux_err = True
 
             if not (has_modelfit_mag or has_modelfit_flux):
                 warnings.warn("No modelfit infomation is available in the columns.")
 
-            if any(col.endswith('_fluxSigma') for col in self._schema):
+            if has_flux_sigma:
                 dm_schema_version = 1
-            elif any(col.endswith('_fluxErr') for col in self._schema):
+            elif has_flux_err:
                 dm_schema_version = 2
-            elif any(col == 'base_Blendedness_abs_instFlux' for col in self._schema):
+            elif 'base_Blendedness_abs_instFlux' in self._schema:
                 dm_schema_version = 3
             else:
                 dm_schema_version = 4
@@ -312,6 +387,7 @@ class DC2ObjectCatalog(BaseGenericCatalog):
                 self.pixel_scale, bands, has_modelfit_mag, has_modelfit_flux, has_modelfit_flag, dm_schema_version)
 
         self._quantity_info_dict = self._generate_info_dict(META_PATH, bands)
+        self._native_quantity_set = frozenset(self._schema).union(self._native_filter_quantities)
         self._len = None
 
     def __del__(self):
@@ -510,7 +586,7 @@ class DC2ObjectCatalog(BaseGenericCatalog):
         schema = None
         try:
             with open(schema_path, 'r') as schema_stream:
-                schema = yaml.safe_load(schema_stream)
+                schema = yaml.load(schema_stream, Loader=_YAML_SAFE_LOADER)
         except (IOError, OSError, yaml.YAMLError):
             pass
 
@@ -615,15 +691,24 @@ class DC2ObjectCatalog(BaseGenericCatalog):
     def _generate_native_quantity_list(self):
         """Return a set of native quantity names as strings"""
 
-        return set(self._schema).union(self._native_filter_quantities)
+        return self._native_quantity_set
+
+    @staticmethod
+    def _obtain_native_data_dict(native_quantities_needed, native_quantity_getter):
+        """
+        Overloading this so that only the needed columns are read,
+        all at once, from each dataset
+        """
+        return native_quantity_getter.read_columns(native_quantities_needed)
 
     def _iter_native_dataset(self, native_filters=None):
-        for dataset in self._datasets:
-            if (native_filters is None or
-                    native_filters.check_scalar(dataset.tract_and_patch)):
-                yield dataset.get
-                if not self.use_cache:
-                    dataset.clear_cache()
+        datasets = self._datasets
+        if native_filters is not None:
+            datasets = itertools.compress(datasets, native_filters.mask(self._tracts_and_patches))
+        for dataset in datasets:
+            yield dataset
+            if not self.use_cache:
+                dataset.clear_cache()
 
     def __len__(self):
         if self._len is None:
@@ -4,15 +4,28 @@ DC2 Parquet Photo-z Catalog Reader
 
 import os
 import re
+import types
 import warnings
 import numpy as np
 from .dc2_dm_catalog import DC2DMCatalog, DC2DMTractCatalog
 from GCR import BaseGenericCatalog
 from .parquet import ParquetFileWrapper
+from .photoz import _compute_pdf_bin_centers
 
 __all__ = ['DC2PhotozMixin', 'CosmoDC2Parquet', 'DC2PhotozGalaxyCatalog',
            'DC2PhotozCatalog', 'PZSKRFCatalog']
 
+_PHOTOZ_MODIFIERS = types.MappingProxyType({
+    'photoz_odds': 'ODDS',
+    'photoz_mode': 'z_mode',
+    'photoz_median': 'z_median',
+    'photoz_mean': 'z_mean',
+    'photoz_pdf': 'pdf',
+    'ID': 'galaxy_id',
+    'photoz_mode_ml': 'z_mode_ml',
+    'photoz_mode_ml_red_chi2': 'z_mode_ml_red_chi2',
+})
+
 
 class DC2PhotozMixin:
 
@@ -29,27 +42,43 @@ class DC2PhotozMixin:
         Returns:
           A dictionary of the form {<homogenized name>: <native name>, ...}
         """
-        modifiers = {
-            'photoz_odds': 'ODDS',
-            'photoz_mode': 'z_mode',
-            'photoz_median': 'z_median',
-            'photoz_mean': 'z_mean',
-            'photoz_pdf': 'pdf',
-            'ID': 'galaxy_id',
-            'photoz_mode_ml': 'z_mode_ml',
-            'photoz_mode_ml_red_chi2': 'z_mode_ml_red_chi2',
-        }
-        return modifiers
+        # return a copy, since GCR may add modifiers to the catalog's dict
+        return dict(_PHOTOZ_MODIFIERS)
 
     def _process_pdf_bins(self, pdf_bin_info=None):
         self._pdf_bin_info = pdf_bin_info or self._PDF_BIN_INFO
-        self._pdf_bin_centers = np.round(np.linspace(
+        self._pdf_bin_centers = _compute_pdf_bin_centers(
             self._pdf_bin_info['start'],
             self._pdf_bin_info['stop'],
             self._pdf_bin_info['nbins'],
-        ), self._pdf_bin_info['decimals_to_round'])
+            self._pdf_bin_info['decimals_to_round'],
+        )
         self._n_pdf_bins = len(self._pdf_bin_centers)
 
+    # One chunk per file, so that add-on catalogs line up chunk for chunk with
+    # the main catalog of a composite. `split_row_groups: true` yields one chunk
+    # per row group instead, which keeps `pdf` small for standalone use only.
+    _split_row_groups = False
+
+    def _subclass_init(self, **kwargs):
+        self._split_row_groups = bool(kwargs.get('split_row_groups', False))
+        super()._subclass_init(**kwargs)
+
+    def _iter_native_dataset(self, native_filters=None):
+        if not self._split_row_groups:
+            yield from super()._iter_native_dataset(native_filters)
+            return
+        for dataset in super()._iter_native_dataset(native_filters):
+            for row_group in range(dataset.num_row_groups):
+                yield dataset, row_group
+
+    def _obtain_native_data_dict(self, native_quantities_needed, native_quantity_getter):
+        if not self._split_row_groups:
+            return super()._obtain_native_data_dict(native_quantities_needed, native_quantity_getter)
+        dataset, row_group = native_quantity_getter
+        return dataset.read_columns_row_group(sorted(native_quantities_needed),
+                                              as_dict=True, row_group=row_group)
+
     @property
     def photoz_pdf_bin_centers(self):
         return self._pdf_bin_centers
@@ -58,6 +87,40 @@ class DC2PhotozMixin:
     def n_pdf_bins(self):
         return self._n_pdf_bins
 
+    def sample_photoz(self, pdfs, random_state=None, chunk_size=100000):
+        """Draw one redshift per galaxy from its photo-z PDF
+
+        Args:
+            pdfs: 2d array of shape (n_galaxies, n_pdf_bins), or a sequence of
+                1d arrays as returned for `photoz_pdf`
+            random_state: seed or np.random.Generator (optional)
+            chunk_size (int): number of galaxies processed at once
+
+        Returns:
+            1d array of sampled redshifts (bin centers);
+            NaN for galaxies whose PDF sums to zero
+        """
+        pdfs = np.asarray(pdfs)
+        if pdfs.dtype == object:
+            pdfs = np.stack(pdfs)
+        if pdfs.ndim != 2 or pdfs.shape[1] != self._n_pdf_bins:
+            raise ValueError('`pdfs` must have shape (n_galaxies, {})'.format(self._n_pdf_bins))
+
+        rng = np.random.default_rng(random_state)
+        bin_centers = np.append(self._pdf_bin_centers, np.nan)
+        out = np.empty(len(pdfs), dtype=np.float64)
+        for start in range(0, len(pdfs), chunk_size):
+            cdf = np.cumsum(pdfs[start:start+chunk_size], axis=1, dtype=np.float64)
+            total = cdf[:, -1].copy()
+            total[~(total > 0)] = np.nan
+            # index of the first bin whose cdf reaches the uniform draw in (0, total];
+            # rows with NaN totals are sent to the trailing NaN "bin"
+            u = (1.0 - rng.random(len(cdf))) * total
+            idx = np.count_nonzero(cdf < u[:, np.newaxis], axis=1)
+            idx[np.isnan(total)] = self._n_pdf_bins
+            out[start:start+chunk_size] = bin_centers[idx]
+        return out
+
 
 class CosmoDC2Parquet(DC2DMCatalog):
 
@@ -66,16 +129,19 @@ class CosmoDC2Parquet(DC2DMCatalog):
     def _subclass_init(self, **kwargs):
         self._healpix_pixels = None
         if kwargs.get('healpix_pixels') is not None:
-            self._healpix_pixels = [int(t) for t in kwargs['healpix_pixels']]
+            self._healpix_pixels = {int(t) for t in kwargs['healpix_pixels']}
+        self._info_re = re.compile(self.FILE_PATTERN)
         super()._subclass_init(**kwargs)
 
     def _extract_dataset_info(self, filename):
-        match = re.match(self.FILE_PATTERN, filename)
+        match = self._info_re.match(filename)
         try:
             zlo, _, hpx = tuple(map(int, match.groups()))
         except (ValueError, TypeError, AttributeError):
             warnings.warn('Filename {} does not contain correct z/healpix info or not in correct format. Skipped')
             return False
+        if self._healpix_pixels and hpx not in self._healpix_pixels:
+            return False
         return {'redshift_block_lower': zlo, 'healpix_pixel': hpx}
 
     def _sort_datasets(self, datasets):
@@ -102,6 +168,8 @@ class DC2PhotozGalaxyCatalog(DC2PhotozMixin, CosmoDC2Parquet):
     file_pattern      (str): The optional regex pattern of served data files
     meta_path         (str): path to yaml entries for quantities
     healpix_pixels   (list): List of tracts (integer)
+    split_row_groups (bool): One chunk per row group instead of per file
+                             (not for add-ons of a composite catalog)
     """
     FILE_DIR = os.path.dirname(os.path.abspath(__file__))
     FILE_PATTERN = r'fzboost_photoz_pdf_z_(\d)_(\d).step_all.healpix_(\d+).parquet'
@@ -129,6 +197,8 @@ class DC2PhotozCatalog(DC2PhotozMixin, DC2DMTractCatalog):
     file_pattern      (str): The optional regex pattern of served data files
     meta_path         (str): path to yaml entries for quantities
     tracts           (list): List of tracts (integer)
+    split_row_groups (bool): One chunk per row group instead of per file
+                             (not for add-ons of a composite catalog)
     """
     FILE_DIR = os.path.dirname(os.path.abspath(__file__))
     FILE_PATTERN = r'photoz_pdf_Run\d\.[0-9a-z]+_tract_\d+\.parquet$'
@@ -164,11 +234,7 @@ class PZSKRFCatalog(DC2PhotozMixin,BaseGenericCatalog):
         self._dataset = ParquetFileWrapper(self._path,None)
         self._columns = self._dataset.columns
         self._quantity_modifiers = self._generate_quantity_modifiers()
-        self._columns = self._dataset.columns
         self._process_pdf_bins(kwargs.get("pdf_bin_info"))
-        
-    def __del__(self):
-        self._dataset = None
 
     def _generate_quantity_modifiers(self):
         quantity_modifiers = {
@@ -190,4 +256,4 @@ class PZSKRFCatalog(DC2PhotozMixin,BaseGenericCatalog):
     
     @staticmethod
     def _obtain_native_data_dict(native_quantities_needed, native_quantity_getter):
-        return native_quantity_getter.read_columns(list(native_quantities_needed), as_dict = True)
+        return native_quantity_getter.read_columns(sorted(native_quantities_needed), as_dict = True)
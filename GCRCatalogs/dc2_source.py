@@ -2,6 +2,7 @@
 DC2 Source Catalog Reader
 """
 
+import functools
 import os
 
 import numpy as np
@@ -11,6 +12,101 @@ from .dc2_dm_catalog import DC2DMVisitCatalog, convert_flux_to_nanoJansky, creat
 __all__ = ['DC2SourceCatalog']
 
 
+def _calc_psf_fwhm_pixel(xx, yy, xy):
+    """Compute 2.355 * (xx * yy - xy * xy) ** 0.25, reusing one scratch buffer"""
+    out = np.asarray(np.multiply(xx, yy))
+    tmp = np.multiply(xy, xy)
+    np.subtract(out, tmp, out=out)
+    np.power(out, 0.25, out=out)
+    np.multiply(out, 2.355, out=out)
+    return out
+
+
+@functools.lru_cache(maxsize=4)
+def _generate_source_modifiers(dm_schema_version):
+    """Build the modifier dict of DC2SourceCatalog once per DM schema version.
+
+    The returned dict is shared; callers must not modify it.
+    """
+    flux_name = 'flux' if dm_schema_version <= 2 else 'instFlux'
+    flux_err_name = 'Sigma' if dm_schema_version <= 1 else 'Err'
+
+    modifiers = {
+        'sourceId': 'id',
+        'visit': 'visit',
+        'detector': 'detector',
+        'filter': 'filter',
+        'objectId': 'objectId',
+        'parentObjectId': 'parent',
+        'ra': (np.rad2deg, 'coord_ra'),
+        'dec': (np.rad2deg, 'coord_dec'),
+        'x': 'slot_Centroid_x',
+        'y': 'slot_Centroid_y',
+        'xErr': 'slot_Centroid_x{}'.format(flux_err_name),
+        'yErr': 'slot_Centroid_y{}'.format(flux_err_name),
+        'xy_flag': 'slot_Centroid_flag',
+        'sky': (convert_flux_to_nanoJansky,
+                'base_LocalBackground_{}'.format(flux_name),
+                'fluxmag0'),
+        'skyErr': (convert_flux_to_nanoJansky,
+                   'base_LocalBackground_{}{}'.format(flux_name, flux_err_name),
+                   'fluxmag0'),
+        'sky_flag': 'base_LocalBackground_flag',
+        'I_flag': 'slot_Shape_flag',
+        'Ixx_pixel': 'slot_Shape_xx',
+        'IxxPSF_pixel': 'slot_PsfShape_xx',
+        'Iyy_pixel': 'slot_Shape_yy',
+        'IyyPSF_pixel': 'slot_PsfShape_yy',
+        'Ixy_pixel': 'slot_Shape_xy',
+        'IxyPSF_pixel': 'slot_PsfShape_xy',
+        'mag': 'mag',
+        'magerr': 'mag_err',
+        'fluxmag0': 'fluxmag0',
+        'apFlux': (convert_flux_to_nanoJansky,
+                   'slot_ApFlux_{}'.format(flux_name),
+                   'fluxmag0'),
+        'apFluxErr': (convert_flux_to_nanoJansky,
+                      'slot_ApFlux_{}{}'.format(flux_name, flux_err_name),
+                      'fluxmag0'),
+        'apFlux_flag': 'slot_ApFlux_flag',
+        'psFlux': (convert_flux_to_nanoJansky,
+                   'slot_PsfFlux_{}'.format(flux_name),
+                   'fluxmag0'),
+        'psFluxErr': (convert_flux_to_nanoJansky,
+                      'slot_PsfFlux_{}{}'.format(flux_name, flux_err_name),
+                      'fluxmag0'),
+        'psFlux_flag': 'slot_PsfFlux_flag',
+        'psNdata': 'slot_PsfFlux_area',
+        'psf_fwhm_pixel': (
+            _calc_psf_fwhm_pixel,
+            'slot_PsfShape_xx',
+            'slot_PsfShape_yy',
+            'slot_PsfShape_xy',
+        ),
+        # There are no 'slot_*' values for the extendedness and blendedness
+        # in the Run 1.2i processing (as of 2019-03-05)
+        'extendedness': 'base_ClassificationExtendedness_value',
+        'blendedness': 'base_Blendedness_abs_{}'.format(flux_name),
+    }
+
+    not_good_flags = (
+        'base_PixelFlags_flag_edge',
+        'base_PixelFlags_flag_interpolatedCenter',
+        'base_PixelFlags_flag_saturatedCenter',
+        'base_PixelFlags_flag_crCenter',
+        'base_PixelFlags_flag_bad',
+        'base_PixelFlags_flag_suspectCenter',
+    )
+
+    modifiers['good'] = (create_basic_flag_mask,) + not_good_flags
+    modifiers['clean'] = (
+        create_basic_flag_mask,
+        'deblend_skipped',
+    ) + not_good_flags
+
+    return modifiers
+
+
 class DC2SourceCatalog(DC2DMVisitCatalog):
     r"""DC2 Source Catalog reader
 
@@ -44,81 +140,5 @@ class DC2SourceCatalog(DC2DMVisitCatalog):
         Returns:
             A dictionary of the form {<homogenized name>: <native name>, ...}
         """
-
-        flux_name = 'flux' if dm_schema_version <= 2 else 'instFlux'
-        flux_err_name = 'Sigma' if dm_schema_version <= 1 else 'Err'
-
-        modifiers = {
-            'sourceId': 'id',
-            'visit': 'visit',
-            'detector': 'detector',
-            'filter': 'filter',
-            'objectId': 'objectId',
-            'parentObjectId': 'parent',
-            'ra': (np.rad2deg, 'coord_ra'),
-            'dec': (np.rad2deg, 'coord_dec'),
-            'x': 'slot_Centroid_x',
-            'y': 'slot_Centroid_y',
-            'xErr': 'slot_Centroid_x{}'.format(flux_err_name),
-            'yErr': 'slot_Centroid_y{}'.format(flux_err_name),
-            'xy_flag': 'slot_Centroid_flag',
-            'sky': (convert_flux_to_nanoJansky,
-                    'base_LocalBackground_{}'.format(flux_name),
-                    'fluxmag0'),
-            'skyErr': (convert_flux_to_nanoJansky,
-                       'base_LocalBackground_{}{}'.format(flux_name, flux_err_name),
-                       'fluxmag0'),
-            'sky_flag': 'base_LocalBackground_flag',
-            'I_flag': 'slot_Shape_flag',
-            'Ixx_pixel': 'slot_Shape_xx',
-            'IxxPSF_pixel': 'slot_PsfShape_xx',
-            'Iyy_pixel': 'slot_Shape_yy',
-            'IyyPSF_pixel': 'slot_PsfShape_yy',
-            'Ixy_pixel': 'slot_Shape_xy',
-            'IxyPSF_pixel': 'slot_PsfShape_xy',
-            'mag': 'mag',
-            'magerr': 'mag_err',
-            'fluxmag0': 'fluxmag0',
-            'apFlux': (convert_flux_to_nanoJansky,
-                       'slot_ApFlux_{}'.format(flux_name),
-                       'fluxmag0'),
-            'apFluxErr': (convert_flux_to_nanoJansky,
-                          'slot_ApFlux_{}{}'.format(flux_name, flux_err_name),
-                          'fluxmag0'),
-            'apFlux_flag': 'slot_ApFlux_flag',
-            'psFlux': (convert_flux_to_nanoJansky,
-                       'slot_PsfFlux_{}'.format(flux_name),
-                       'fluxmag0'),
-            'psFluxErr': (convert_flux_to_nanoJansky,
-                          'slot_PsfFlux_{}{}'.format(flux_name, flux_err_name),
-                          'fluxmag0'),
-            'psFlux_flag': 'slot_PsfFlux_flag',
-            'psNdata': 'slot_PsfFlux_area',
-            'psf_fwhm_pixel': (
-                lambda xx, yy, xy: 2.355 * (xx * yy - xy * xy) ** 0.25,
-                'slot_PsfShape_xx',
-                'slot_PsfShape_yy',
-                'slot_PsfShape_xy',
-            ),
-            # There are no 'slot_*' values for the extendedness and blendedness
-            # in the Run 1.2i processing (as of 2019-03-05)
-            'extendedness': 'base_ClassificationExtendedness_value',
-            'blendedness': 'base_Blendedness_abs_{}'.format(flux_name),
-        }
-
-        not_good_flags = (
-            'base_PixelFlags_flag_edge',
-            'base_PixelFlags_flag_interpolatedCenter',
-            'base_PixelFlags_flag_saturatedCenter',
-            'base_PixelFlags_flag_crCenter',
-            'base_PixelFlags_flag_bad',
-            'base_PixelFlags_flag_suspectCenter',
-        )
-
-        modifiers['good'] = (create_basic_flag_mask,) + not_good_flags
-        modifiers['clean'] = (
-            create_basic_flag_mask,
-            'deblend_skipped',
-        ) + not_good_flags
-
-        return modifiers
+        # copy, since GCR may add modifiers to the catalog's dict
+        return dict(_generate_source_modifiers(dm_schema_version))
@@ -1,6 +1,9 @@
+import concurrent.futures
+import itertools
 import os
 import warnings
 import sqlite3
+import urllib.parse
 import numpy as np
 import h5py
 from GCR import BaseGenericCatalog
@@ -10,6 +13,68 @@ __all__ = ['DC2TruthCatalogReader', 'DC2TruthCatalogLightCurveReader',
            'DC2TruthLCSummaryReader']
 
 
+# numpy 1.23+ can build structured arrays with fromiter
+_FROMITER_STRUCTURED = np.lib.NumpyVersion(np.__version__) >= '1.23.0'
+
+
+def _fetch_structured_array(cursor, dtype, size=None):
+    """
+    Return the rows of an executed `cursor` (or any iterable of row tuples)
+    as a structured array of `dtype`, filling the array straight from the
+    rows instead of via fetchall(). If `size` is given, read at most that
+    many rows.
+    """
+    if size is not None:
+        cursor = itertools.islice(cursor, size)
+    if not _FROMITER_STRUCTURED:
+        return np.array(list(cursor), dtype)
+    return np.fromiter(cursor, dtype)
+
+
+# numpy equivalents of common SQL column types; other declared types
+# are expected to be numpy type names already (e.g. 'f8', 'int64')
+_SQL_TYPE_DTYPES = {
+    'INTEGER': np.int64,
+    'INT': np.int64,
+    'BIGINT': np.int64,
+    'REAL': np.float64,
+    'DOUBLE': np.float64,
+    'FLOAT': np.float64,
+    'BOOLEAN': np.bool_,
+}
+
+
+def _parse_column_types(table_info):
+    """
+    Map the column names in the rows of `PRAGMA table_info` to numpy dtypes.
+    Types numpy cannot parse are kept as strings, so that only a query
+    that actually asks for such a column fails.
+    """
+    dtypes = {}
+    for _, name, declared_type, *_ in table_info:
+        try:
+            dtypes[name] = np.dtype(_SQL_TYPE_DTYPES.get(declared_type.upper(), declared_type))
+        except TypeError:
+            dtypes[name] = declared_type
+    return dtypes
+
+
+def _connect_read_only(filename, **kwargs):
+    """
+    Open the sqlite database `filename` read-only. The truth databases are
+    static, so locking is skipped and pages are memory-mapped and cached.
+    Extra keyword arguments are passed to sqlite3.connect.
+    """
+    uri = 'file:{}?mode=ro&immutable=1'.format(urllib.parse.quote(os.path.abspath(filename)))
+    conn = sqlite3.connect(uri, uri=True, **kwargs)
+    # sqlite silently caps mmap_size at its compile-time maximum
+    conn.execute('PRAGMA mmap_size={};'.format(1 << 35))
+    conn.execute('PRAGMA cache_size=-262144;')  # in KiB, i.e. 256 MiB
+    conn.execute('PRAGMA query_only=ON;')
+    conn.execute('PRAGMA temp_store=MEMORY;')
+    return conn
+
+
 class DC2TruthLCSummaryReader(BaseGenericCatalog):
     """
     Reader for hdf5 file containing summary information for variables and
@@ -19,10 +84,15 @@ class DC2TruthLCSummaryReader(BaseGenericCatalog):
     ----------
     filename: str
         path to the hdf5 file containing the summary catalog
+    chunk_size: int, optional
+        maximal number of rows returned per iteration (default: 1000000)
     """
 
     def _subclass_init(self, **kwargs):
         self._file_name = kwargs['filename']
+        self._chunk_size = int(kwargs.get('chunk_size', 1000000))
+        if self._chunk_size <= 0:
+            raise ValueError('`chunk_size` must be a positive integer')
 
         self._info_dict = {}
         self._info_dict['redshift'] = {'units': 'unitless'}
@@ -63,9 +133,13 @@ class DC2TruthLCSummaryReader(BaseGenericCatalog):
             warnings.warn("Native filters are not implemented "
                           "for this catalog; just use filters.")
         with h5py.File(self._file_name, 'r') as file_handle:
-            def _native_qty_getter(qty_name):
-                return file_handle[qty_name][()]
-            yield _native_qty_getter
+            # all datasets in the file should have one entry per object;
+            # take the longest, so that no rows are dropped if they do not
+            n_rows = max((len(d) for d in file_handle.values() if isinstance(d, h5py.Dataset)), default=0)
+            for start in range(0, max(n_rows, 1), self._chunk_size):
+                def _native_qty_getter(qty_name, start=start):
+                    return file_handle[qty_name][start:start + self._chunk_size]
+                yield _native_qty_getter
 
     def get_quantities(self, quantities, filters=None, native_filters=None, return_iterator=False):
         if native_filters is not None:
@@ -92,6 +166,8 @@ class DC2TruthCatalogReader(BaseGenericCatalog):
         whether or not this is for static objects only
     base_filters : str or list of str, optional
         set of filters to always apply to the where clause
+    chunk_size : int, optional
+        maximal number of rows returned per iteration (default: 1000000)
     """
 
     native_filter_string_only = True
@@ -101,6 +177,9 @@ class DC2TruthCatalogReader(BaseGenericCatalog):
 
         self._table_name = kwargs.get('table_name', 'truth')
         self._is_static = kwargs.get('is_static', True)
+        self._chunk_size = int(kwargs.get('chunk_size', 1000000))
+        if self._chunk_size <= 0:
+            raise ValueError('`chunk_size` must be a positive integer')
 
         base_filters = kwargs.get('base_filters')
         if base_filters:
@@ -117,7 +196,7 @@ class DC2TruthCatalogReader(BaseGenericCatalog):
         if kwargs.get('md5') and md5(self._filename) != kwargs['md5']:
             raise ValueError('md5 sum does not match!')
 
-        self._conn = sqlite3.connect(self._filename)
+        self._conn = _connect_read_only(self._filename)
 
         # get the descriptions of the columns as provided in the sqlite database
         cursor = self._conn.cursor()
@@ -128,9 +207,15 @@ class DC2TruthCatalogReader(BaseGenericCatalog):
             self._column_descriptions = dict()
 
         results = cursor.execute('PRAGMA table_info({});'.format(self._table_name))
-        self._native_quantity_dtypes = {t[1]: t[2] for t in results.fetchall()}
+        self._native_quantity_dtypes = _parse_column_types(results.fetchall())
 
         if self._is_static:
+            # the flag columns are stored as integers; fetch them straight
+            # into booleans instead of converting after the fact
+            for col in ('agn', 'star', 'sprinkled'):
+                if col in self._native_quantity_dtypes:
+                    self._native_quantity_dtypes[col] = np.dtype(bool)
+
             self._quantity_modifiers = {
                 'mag_true_u': 'u',
                 'mag_true_g': 'g',
@@ -138,9 +223,9 @@ class DC2TruthCatalogReader(BaseGenericCatalog):
                 'mag_true_i': 'i',
                 'mag_true_z': 'z',
                 'mag_true_y': 'y',
-                'agn': (lambda x: x.astype(bool)),
-                'star': (lambda x: x.astype(bool)),
-                'sprinkled': (lambda x: x.astype(bool)),
+                'agn': 'agn',
+                'star': 'star',
+                'sprinkled': 'sprinkled',
             }
 
     def _generate_native_quantity_list(self):
@@ -167,19 +252,40 @@ class DC2TruthCatalogReader(BaseGenericCatalog):
         else:
             query_where_clause = ''
 
+        # The query is only known once GCR asks for the quantities, so it is
+        # executed on the first call of the getter; each yielded getter then
+        # returns the next `chunk_size` rows of that same result set. One row
+        # is read ahead, so that no getter is yielded once the rows run out.
+        state = {'columns': None, 'dtype': None, 'rows_read': 0, 'next_row': None}
+
         def dc2_truth_native_quantity_getter(quantities):
             # note the API of this getter is not normal, and hence
             # we have overwritten _obtain_native_data_dict
-            dtype = np.dtype([(q, self._native_quantity_dtypes[q]) for q in quantities])
-            query = 'SELECT {} FROM {} {};'.format(
-                ', '.join(quantities),
-                self._table_name,
-                query_where_clause
-            )
-            # may need to switch to fetchmany for larger dataset
-            return np.array(cursor.execute(query).fetchall(), dtype)
+            columns = sorted(quantities)
+            if columns != state['columns']:
+                # first call, or (unusually) other quantities than for the
+                # previous chunk: query again, skipping the rows already returned;
+                # ORDER BY rowid keeps the row order the same for every query plan
+                state['columns'] = columns
+                state['dtype'] = np.dtype([(q, self._native_quantity_dtypes[q]) for q in columns])
+                cursor.execute('SELECT {} FROM {} {} ORDER BY rowid LIMIT -1 OFFSET {};'.format(
+                    ', '.join(columns),
+                    self._table_name,
+                    query_where_clause,
+                    state['rows_read'],
+                ))
+                state['next_row'] = cursor.fetchone()
+            rows = cursor
+            if state['next_row'] is not None:
+                rows = itertools.chain((state['next_row'],), cursor)
+            data = _fetch_structured_array(rows, state['dtype'], self._chunk_size)
+            state['rows_read'] += len(data)
+            state['next_row'] = cursor.fetchone() if len(data) == self._chunk_size else None
+            return data
 
         yield dc2_truth_native_quantity_getter
+        while state['next_row'] is not None:
+            yield dc2_truth_native_quantity_getter
 
     def _get_quantity_info_dict(self, quantity, default=None):
         if quantity in self._column_descriptions:
@@ -207,6 +313,9 @@ class DC2TruthCatalogLightCurveReader(BaseGenericCatalog):
 
     native_filter_string_only = True
 
+    # number of light-curve rows read from the database at a time
+    _block_size = 100000
+
     def _subclass_init(self, **kwargs):
         self._filename = kwargs['filename']
 
@@ -230,12 +339,12 @@ class DC2TruthCatalogLightCurveReader(BaseGenericCatalog):
         if kwargs.get('md5') and md5(self._filename) != kwargs['md5']:
             raise ValueError('md5 sum does not match!')
 
-        self._conn = sqlite3.connect(self._filename)
+        self._conn = _connect_read_only(self._filename)
         cursor = self._conn.cursor()
         self._dtypes = dict()
         for table, table_name in self._tables.items():
             results = cursor.execute('PRAGMA table_info({});'.format(table_name))
-            self._dtypes[table] = {t[1]: t[2] for t in results.fetchall()}
+            self._dtypes[table] = _parse_column_types(results.fetchall())
         self._dtypes['light_curves'].update(self._dtypes['obs_meta'])
         del self._dtypes['obs_meta']
 
@@ -265,29 +374,94 @@ class DC2TruthCatalogLightCurveReader(BaseGenericCatalog):
 
         id_col_name = 'uniqueId'
         dtype = np.dtype([(id_col_name, self._dtypes['summary'][id_col_name])])
-        query = 'SELECT DISTINCT {} FROM {} {};'.format(
+        # sorted, to match the order in which the light curves are read below
+        query = 'SELECT DISTINCT {0} FROM {1} {2} ORDER BY {0};'.format(
             id_col_name,
             self._tables['summary'],
             query_where_clause
         )
-        ids_needed = np.array(cursor.execute(query).fetchall(), dtype)[id_col_name]
-
-        for id_this in ids_needed:
-            def dc2_truth_light_curve_native_quantity_getter(quantities):
-                # When 'obshistid' is needed, change it to 'obs_meta.obshistid'
-                # so that the SQL query would work
-                quantities_str = ', '.join((
-                    (self._tables['obs_meta'] + '.obshistid') if q == 'obshistid'
-                    else q for q in quantities
-                ))
-                dtype = np.dtype([(q, self._dtypes['light_curves'][q]) for q in quantities])
-                query = 'SELECT {0} FROM {1} JOIN {2} ON {1}.{4}={5} AND {1}.{3}={2}.{3};'.format(
-                    quantities_str,
-                    self._tables['light_curves'],
-                    self._tables['obs_meta'],
-                    'obshistid',
-                    id_col_name,
-                    id_this # pylint: disable=cell-var-from-loop
-                )
-                return np.array(cursor.execute(query).fetchall(), dtype)
-            yield dc2_truth_light_curve_native_quantity_getter
+        ids_needed = _fetch_structured_array(cursor.execute(query), dtype)[id_col_name]
+
+        # All light curves are read with a single query, sorted by id, and are
+        # split into one light curve per object as the rows stream in. The query
+        # depends on the quantities GCR passes to the first getter. The next
+        # block of rows is read in a background thread while the current one
+        # is split and processed, so the stream has a connection of its own.
+        stream = _connect_read_only(self._filename, check_same_thread=False)
+        stream_cursor = stream.cursor()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        state = {'quantities': None, 'rows': None, 'next_block': None}
+
+        def read_ahead(dtype):
+            state['next_block'] = executor.submit(
+                _fetch_structured_array, stream_cursor, dtype, self._block_size
+            )
+
+        def read_light_curve(id_this):
+            while True:
+                rows = state['rows']
+                end = np.searchsorted(rows[id_col_name], id_this, side='right')
+                if end < len(rows) or state['next_block'] is None:
+                    start = np.searchsorted(rows[id_col_name], id_this, side='left')
+                    state['rows'] = rows[end:]
+                    return rows[start:end].copy()
+                more = state['next_block'].result()
+                state['next_block'] = None
+                if len(more) == self._block_size:
+                    read_ahead(rows.dtype)
+                state['rows'] = np.concatenate([rows, more])
+
+        try:
+            for id_this in ids_needed:
+                def dc2_truth_light_curve_native_quantity_getter(quantities, id_this=id_this):
+                    if state['quantities'] is None:
+                        state['quantities'] = frozenset(quantities)
+                        # the id column is always read, to split the rows by object
+                        query, dtype = self._light_curve_query(
+                            sorted(state['quantities'].union([id_col_name])),
+                            query_where_clause,
+                        )
+                        stream_cursor.execute(query)
+                        state['rows'] = np.empty(0, dtype)
+                        read_ahead(dtype)
+                    elif frozenset(quantities) != state['quantities']:
+                        # (unusually) other quantities than for the previous light
+                        # curves: query this one on its own, and skip it in the stream
+                        read_light_curve(id_this)
+                        query, dtype = self._light_curve_query(quantities, '', id_this)
+                        return _fetch_structured_array(self._conn.execute(query), dtype)
+                    return read_light_curve(id_this)
+                yield dc2_truth_light_curve_native_quantity_getter
+        finally:
+            if state['next_block'] is not None:
+                state['next_block'].cancel()
+            executor.shutdown(wait=True)
+            stream.close()
+
+    def _light_curve_query(self, quantities, query_where_clause, id_this=None):
+        """
+        Return the SQL text and the structured dtype for reading `quantities`
+        of all light curves whose objects pass `query_where_clause`, sorted by id,
+        or, if `id_this` is given, of the light curve of that object only
+        """
+        # When 'obshistid' is needed, change it to 'obs_meta.obshistid'
+        # so that the SQL query would work
+        quantities_str = ', '.join((
+            (self._tables['obs_meta'] + '.obshistid') if q == 'obshistid'
+            else q for q in quantities
+        ))
+        dtype = np.dtype([(q, self._dtypes['light_curves'][q]) for q in quantities])
+        if id_this is None:
+            selection = 'IN (SELECT {0} FROM {1} {2}) ORDER BY {3}.{0}'.format(
+                'uniqueId', self._tables['summary'], query_where_clause, self._tables['light_curves'])
+        else:
+            selection = '= {}'.format(int(id_this))
+        query = 'SELECT {0} FROM {1} JOIN {2} ON {1}.{3}={2}.{3} WHERE {1}.{4} {5};'.format(
+            quantities_str,
+            self._tables['light_curves'],
+            self._tables['obs_meta'],
+            'obshistid',
+            'uniqueId',
+            selection,
+        )
+        return query, dtype
@@ -4,7 +4,6 @@ Reader for truth-match catalogs persisted as parquet files and partitioned in tr
 import os
 
 import numpy as np
-import astropy.units as u
 
 from .dc2_dm_catalog import DC2DMTractCatalog
 
@@ -14,13 +13,34 @@ FILE_DIR = os.path.dirname(os.path.abspath(__file__))
 META_PATH = os.path.join(FILE_DIR, 'catalog_configs/_dc2_truth_match_meta.yaml')
 
 
+# AB magnitude of a 1 nJy source: 8.90 for 1 Jansky, plus 2.5 * 9 for nano = 10**(-9)
+_AB_MAG_OF_ONE_NANOJANSKY = 8.90 + 2.5 * 9
+
+
 def _flux_to_mag(flux):
-    with np.errstate(divide="ignore"):
-        mag = (flux * u.nJy).to_value(u.ABmag)  # pylint: disable=no-member
+    # same as (flux * u.nJy).to_value(u.ABmag), without the astropy Quantity overhead
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mag = np.log10(flux)
+    mag *= -2.5
+    mag += _AB_MAG_OF_ONE_NANOJANSKY
     mag[~np.isfinite(mag)] = np.nan  # homogenize inf and nan
     return mag
 
 
+def _galaxy_truth_id(truth_id, truth_type):
+    # `id` is a string column; only parse the entries that are kept, instead of
+    # building a full string array with "-1" filled in and parsing all of it
+    out = np.full(len(truth_id), -1, dtype=np.int64)
+    selected = truth_type < 3
+    out[selected] = np.asarray(truth_id)[selected].astype(np.int64)
+    return out
+
+
+def _masked_by_match(data, match_mask):
+    # keep the entries selected by `match_mask`; np.ma masks where the mask is True
+    return np.ma.array(data, mask=~match_mask, copy=False)
+
+
 class DC2TruthMatchCatalog(DC2DMTractCatalog):
     r"""
     DC2 Truth-Match (parquet) Catalog reader
@@ -84,37 +104,56 @@ class DC2TruthMatchCatalog(DC2DMTractCatalog):
         """
         When `as_object_addon` or `as_truth_table` is set, we need to filter the table
         based on `match_objectId` or `is_unique_truth_entry` before the data is returned .
-        To achieve such, we have to overwrite this method to inject the additional columns
-        and to apply the masks.
+        To achieve such, we have to overwrite this method to pass the corresponding
+        row filter to the parquet reader, which then skips row groups that have no
+        matching rows at all.
         """
-        native_quantities_needed = set(native_quantities_needed)
+        filters = None
         if self._as_object_addon:
-            native_quantities_needed.add("match_objectId")
+            # matched rows come first, in the same order as the object catalog
+            filters = [("match_objectId", ">", -1)]
         elif self._as_truth_table:
-            native_quantities_needed.add("is_unique_truth_entry")
+            filters = [("is_unique_truth_entry", "==", True)]
 
-        columns = list(native_quantities_needed)
-        d = native_quantity_getter.read_columns(columns, as_dict=False)
-        if self._as_object_addon:
-            n = np.count_nonzero(d["match_objectId"].values > -1)
-            return {c: d[c].values[:n] for c in columns}
-        elif self._as_truth_table:
-            mask = d["is_unique_truth_entry"].values
-            return {c: d[c].values[mask] for c in columns}
-        return {c: d[c].values for c in columns}
+        return native_quantity_getter.read_columns(sorted(native_quantities_needed),
+                                                   as_dict=True, filters=filters)
+
+    @staticmethod
+    def _count_rows(dataset, column, select):
+        """
+        Count the rows of `dataset` for which `select(column)` is true.
+        `select` must be monotonic in the column value, so that a row group whose
+        minimum passes is kept entirely, and one whose maximum fails is skipped
+        entirely. Only the row groups in between are read.
+        """
+        metadata = dataset.handle.metadata
+        column_index = metadata.schema.names.index(column)
+        count = 0
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            stats = row_group.column(column_index).statistics
+            if stats is not None and stats.has_min_max:
+                if select(stats.min) and not stats.null_count:
+                    count += row_group.num_rows
+                    continue
+                if not select(stats.max):
+                    continue
+            values = dataset.read_columns_row_group([column], as_dict=True, row_group=i)[column]
+            count += np.count_nonzero(select(values))
+        return count
 
     def __len__(self):
         if self._len is None:
             # pylint: disable=attribute-defined-outside-init
             if self._as_object_addon:
                 self._len = sum(
-                    np.count_nonzero(d["match_objectId"] > -1)
-                    for d in self.get_quantities(["match_objectId"], return_iterator=True)
+                    self._count_rows(dataset, "match_objectId", lambda v: v > -1)
+                    for dataset in self._datasets
                 )
             elif self._as_truth_table:
                 self._len = sum(
-                    np.count_nonzero(d["is_unique_truth_entry"])
-                    for d in self.get_quantities(["is_unique_truth_entry"], return_iterator=True)
+                    self._count_rows(dataset, "is_unique_truth_entry", lambda v: np.asarray(v, dtype=bool))
+                    for dataset in self._datasets
                 )
             else:
                 self._len = sum(len(dataset) for dataset in self._datasets)
@@ -127,7 +166,7 @@ class DC2TruthMatchCatalog(DC2DMTractCatalog):
         """
 
         quantity_modifiers = {
-            "truthId": (lambda i, t: np.where(t < 3, i, "-1").astype(np.int64), "id", "truth_type"),
+            "truthId": (_galaxy_truth_id, "id", "truth_type"),
             "objectId": "match_objectId",
             "is_matched": "is_good_match",
             "is_star": (lambda t: t > 1, "truth_type"),
@@ -154,7 +193,7 @@ class DC2TruthMatchCatalog(DC2DMTractCatalog):
             for t in ("galaxy", "star"):
                 self.add_derived_quantity(
                     "{}_{}".format(col, t),
-                    lambda d, m: np.ma.array(d, mask=m),
+                    _masked_by_match,
                     col,
                     "{}_match_mask".format(t),
                 )
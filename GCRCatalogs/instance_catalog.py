@@ -3,7 +3,7 @@ instance catalog reader
 """
 from __future__ import division, print_function
 import os
-import gc
+import collections
 import gzip
 import warnings
 from functools import partial
@@ -114,6 +114,9 @@ class InstanceCatalog(BaseGenericCatalog):
     """
     Instance catalog class. Uses generic quantity and filter mechanisms
     defined by BaseGenericCatalog class.
+
+    Loaded object tables are kept in a least-recently-used cache whose total
+    size is capped by the `cache_bytes` option (default: 8 GiB).
     """
 
     _base_col_names = [
@@ -194,7 +197,8 @@ class InstanceCatalog(BaseGenericCatalog):
         self.lightcone = True
 
         self.legacy_gal_catalog = False
-        self._data = dict()
+        self._data = collections.OrderedDict()
+        self._cache_budget_bytes = int(kwargs.get('cache_bytes', 8 << 30))
         self._object_files = dict()
         for filename in self.header['includeobj']:
             obj_type = filename.partition('_cat_')[0]
@@ -320,17 +324,25 @@ class InstanceCatalog(BaseGenericCatalog):
 
         return self._pd_read_table(obj_type)
 
+    @staticmethod
+    def _cached_nbytes(value):
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(deep=False).sum())
+        return 0
+
     def load_single_catalog(self, obj_type):
-        if obj_type not in self._data:
-            try:
-                self._data[obj_type] = self._load_single_catalog(obj_type)
-            except MemoryError:
-                if not self._data:
-                    raise
-                self._data.clear()
-                gc.collect()
-                return self.load_single_catalog(obj_type)
-        return self._data[obj_type]
+        if obj_type in self._data:
+            self._data.move_to_end(obj_type)
+            return self._data[obj_type]
+
+        df = self._load_single_catalog(obj_type)
+        # evict least recently used tables until the new one fits the budget
+        needed = self._cached_nbytes(df)
+        cached = sum(self._cached_nbytes(v) for v in self._data.values())
+        while self._data and cached + needed > self._cache_budget_bytes:
+            cached -= self._cached_nbytes(self._data.popitem(last=False)[1])
+        self._data[obj_type] = df
+        return df
 
     def _native_quantity_getter(self, native_quantity):
         obj_type, _, col_name = native_quantity.partition('/')
@@ -1,19 +1,41 @@
-import pyarrow.parquet as pq
+import os
 import re
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+
 __all__ = ['ParquetFileWrapper']
 
+_INTERNAL_COLUMN_RE = re.compile(r'__\w+__$')
+
+
+def _column_to_numpy(column):
+    """
+    Return the values of an Arrow column as `DataFrame[col].values` would.
+    Numeric and boolean columns without nulls are converted straight to a
+    (writable) NumPy array, without going through pandas.
+    """
+    column_type = column.type
+    if column.null_count == 0 and (pa.types.is_integer(column_type) or
+                                   pa.types.is_floating(column_type) or
+                                   pa.types.is_boolean(column_type)):
+        if column.num_chunks == 1:
+            return column.chunk(0).to_numpy(zero_copy_only=False, writable=True)
+        return column.to_numpy()
+    return column.to_pandas().values
+
 
 def _retrieve_data_from_arrow_table(table, as_dict=False):
+    if as_dict:
+        # Convert each column on its own, skipping the DataFrame construction
+        return {col: _column_to_numpy(arr) for col, arr in zip(table.column_names, table.columns)}
+
     try:
         # Options introdcued in arrow 0.16+ to improve speed and memory usage
         df = table.to_pandas(split_blocks=True, self_destruct=True)
     except TypeError:
         df = table.to_pandas()
 
-    if as_dict:
-        return {col: arr.values for col, arr in df.items()}
-
     return df
 
 
@@ -48,7 +70,13 @@ class ParquetFileWrapper():
     @property
     def handle(self):
         if self._handle is None:
-            self._handle = pq.ParquetFile(self.path)
+            # memory-map local files so only the pages of columns actually read are faulted in
+            memory_map = os.path.isfile(self.path)
+            try:
+                # pre_buffer (arrow 1.0+) coalesces column-chunk reads into fewer, larger requests
+                self._handle = pq.ParquetFile(self.path, memory_map=memory_map, pre_buffer=True)
+            except TypeError:
+                self._handle = pq.ParquetFile(self.path, memory_map=memory_map)
         return self._handle
 
     @property
@@ -72,7 +100,7 @@ class ParquetFileWrapper():
     def __contains__(self, item):
         return item in self.columns
 
-    def read_columns(self, columns, as_dict=False):
+    def read_columns(self, columns, as_dict=False, filters=None):
         '''
         Read all values for specified columns
 
@@ -81,29 +109,40 @@ class ParquetFileWrapper():
         columns   list of columns to be read
         as_dict   boolean.  If true, return data as dict where keys are column names
                             Else return pandas dataframe
+        filters   row filter in any form accepted by pyarrow.parquet.read_table (optional).
+                  Row groups whose statistics rule out all rows are skipped.
+                  Filter columns need not be in `columns`.
         Returns
         -------
         dict or dataframe   See as_dict parameter above
 
         '''
-        table = self.handle.read(columns=columns)
+        if filters is None:
+            table = self.handle.read(columns=columns)
+        else:
+            table = pq.read_table(self.path, columns=columns, filters=filters,
+                                  memory_map=os.path.isfile(self.path))
         return _retrieve_data_from_arrow_table(table, as_dict=as_dict)
 
-    def read_columns_row_group(self, columns, as_dict=False):
+    def read_columns_row_group(self, columns, as_dict=False, row_group=None):
         '''
-        Read specified columns for a single row group, the one stored in the property
-        current_row_group
+        Read specified columns for a single row group, by default the one stored
+        in the property current_row_group
 
         Parameters
         ----------
         columns   list of columns to be read
         as_dict   boolean.  If true, return data as dict where keys are column names
                             Else return pandas dataframe
+        row_group int.      Index of the row group to read (optional).
+                            If None, use current_row_group
         Returns
         -------
         dict or dataframe   See as_dict parameter above
         '''
-        table = self.handle.read_row_group(self.current_row_group, columns=columns)
+        if row_group is None:
+            row_group = self.current_row_group
+        table = self.handle.read_row_group(row_group, columns=columns)
         return _retrieve_data_from_arrow_table(table, as_dict=as_dict)
 
     @property
@@ -118,8 +157,9 @@ class ParquetFileWrapper():
     @property
     def columns(self):
         if self._columns is None:
-            self._columns = [col for col in self.handle.schema.to_arrow_schema().names
-                             if re.match(r'__\w+__$', col) is None]
+            # schema_arrow is parsed from the file footer only; no column data is read
+            self._columns = [col for col in self.handle.schema_arrow.names
+                             if _INTERNAL_COLUMN_RE.match(col) is None]
         return list(self._columns)
 
     def __getitem__(self, key):
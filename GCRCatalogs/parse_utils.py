@@ -32,6 +32,8 @@ class PathInfoParser():
                 base_pat = base_pat.replace(g, fr'(?P<{gname}>\w+)')
             
         self.pattern = re.compile(base_pat)
+        # groups whose pattern only admits digits can be cast without a try
+        self._int_groups = frozenset(g for g in self._gnames if g in self._known_ints)
 
     @property
     def group_names(self):
@@ -54,9 +56,12 @@ class PathInfoParser():
         m = self.pattern.match(path)
         if not m: return None
 
-        d = m.groupdict() or {}
+        d = m.groupdict()
 
         for (k, v) in d.items():
+            if k in self._int_groups:
+                d[k] = int(v)
+                continue
             try:
                 castv = int(v)
             except ValueError:
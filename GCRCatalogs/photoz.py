@@ -13,6 +13,7 @@ import os
 import warnings
 import shutil
 import glob
+import functools
 
 import yaml
 import numpy as np
@@ -25,14 +26,24 @@ from .utils import first
 __all__ = ['PhotoZCatalog', 'PhotoZCatalog2']
 
 
+@functools.lru_cache(maxsize=None)
+def _compute_pdf_bin_centers(start, stop, nbins, decimals_to_round):
+    """
+    Return PDF bin centers as a read-only array, shared by all callers with the same bin info.
+    """
+    bin_centers = np.round(np.linspace(start, stop, nbins), decimals_to_round)
+    bin_centers.setflags(write=False)
+    return bin_centers
+
+
 class PhotoZCatalog(BaseGenericCatalog):
 
     _FILE_PATTERN = r'run\d\.\d+[a-z]+_PZ_tract_\d+\.h5$'
     _METADATA_FILENAME = 'metadata.yaml'
     _PDF_BIN_INFO = {
         'start': 0.005,
-        'stop': 1.01,
-        'step': 0.01,
+        'stop': 1.005,
+        'nbins': 101,
         'decimals_to_round': 3,
     }
 
@@ -43,11 +54,19 @@ class PhotoZCatalog(BaseGenericCatalog):
         self._metadata_path = os.path.join(self.base_dir, _metadata_filename)
 
         self._pdf_bin_info = kwargs.get('pdf_bin_info', self._PDF_BIN_INFO)
-        self._pdf_bin_centers = np.round(np.arange(
+        if 'nbins' not in self._pdf_bin_info:  # for backward compatibility with (start, stop, step)
+            nbins = int(np.ceil((self._pdf_bin_info['stop'] - self._pdf_bin_info['start']) / self._pdf_bin_info['step']))
+            self._pdf_bin_info = dict(
+                self._pdf_bin_info,
+                stop=self._pdf_bin_info['start'] + (nbins - 1) * self._pdf_bin_info['step'],
+                nbins=nbins,
+            )
+        self._pdf_bin_centers = _compute_pdf_bin_centers(
             self._pdf_bin_info['start'],
             self._pdf_bin_info['stop'],
-            self._pdf_bin_info['step'],
-        ), self._pdf_bin_info['decimals_to_round'])
+            self._pdf_bin_info['nbins'],
+            self._pdf_bin_info['decimals_to_round'],
+        )
         self._n_pdf_bins = len(self._pdf_bin_centers)
 
         if self._metadata_path and os.path.isfile(self._metadata_path):
@@ -206,9 +225,9 @@ class PhotoZFileObject():
 
     def __getitem__(self, key):
         if key == 'tract':
-            return np.repeat(self.tract, len(self))
+            return np.broadcast_to(self.tract, (len(self),))
         if key == 'patch':
-            return np.repeat(self.patch, len(self))
+            return np.broadcast_to(self.patch, (len(self),))
         return self.handle[key][()]
 
     get = __getitem__
@@ -99,7 +99,8 @@ class PZMagErrCatalog(BaseGenericCatalog):
         return self._info_dict.get(quantity,default)
  
     def _generate_native_quantity_list(self):
-        return pd.read_hdf(first(self._healpix_files.values())).columns.tolist()
+        # read zero rows so that only the table metadata is touched
+        return pd.read_hdf(first(self._healpix_files.values()), start=0, stop=0).columns.tolist()
 
     def _iter_native_dataset(self, native_filters=None):
         for (zlo_this, hpx_this), file_path in self._healpix_files.items():
@@ -261,9 +262,9 @@ class PhotoZFileObject3():
 
     def __getitem__(self, key):
         if key == 'healpix_pixel':
-            return np.repeat(self.healpix_pixel, len(self))
+            return np.broadcast_to(self.healpix_pixel, (len(self),))
         if key == 'redshift_block_lower':
-            return np.repeat(self.z_block_lower, len(self))
+            return np.broadcast_to(self.z_block_lower, (len(self),))
         return self.handle[key][()]
 
     get = __getitem__
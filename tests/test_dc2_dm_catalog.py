@@ -0,0 +1,91 @@
+"""
+Tests for the DC2 DM (parquet) base reader
+"""
+import threading
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from numpy.testing import assert_array_equal
+
+from GCRCatalogs.dc2_truth_match import DC2TruthMatchCatalog
+from GCRCatalogs.parquet import ParquetFileWrapper
+
+# pylint: disable=redefined-outer-name
+
+TRACTS = (3830, 3831, 3832, 3833)
+
+
+@pytest.fixture(scope='module')
+def truth_match_dir(tmp_path_factory):
+    """Four small truth-match tract files"""
+    base_dir = tmp_path_factory.mktemp('truth_match')
+    rng = np.random.default_rng(7)
+    for tract in TRACTS:
+        n = 1000 + tract % 10 * 100
+        df = pd.DataFrame({
+            'id': np.arange(n).astype(str),
+            'ra': rng.random(n),
+            'dec': rng.random(n),
+            'flux_r': rng.random(n).astype(np.float32),
+            'flux_r_noMW': rng.random(n).astype(np.float32),
+            'truth_type': rng.integers(1, 4, n),
+            'match_objectId': np.where(np.arange(n) < n // 2, np.arange(n), -1),
+            'is_good_match': rng.random(n) < 0.5,
+            'is_unique_truth_entry': rng.random(n) < 0.5,
+        })
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False),
+                       str(base_dir / 'truth_tract{}.parquet'.format(tract)), row_group_size=300)
+    return str(base_dir)
+
+
+def _load(base_dir, prefetch_depth):
+    catalog = DC2TruthMatchCatalog(base_dir=base_dir)
+    catalog._prefetch_depth = prefetch_depth  # pylint: disable=protected-access
+    return catalog
+
+
+@pytest.mark.parametrize('prefetch_depth', [1, 2])
+def test_prefetch_matches_sequential(truth_match_dir, prefetch_depth):
+    """Read-ahead must not change the chunks returned, with or without filters"""
+    sequential = _load(truth_match_dir, 0)
+    prefetched = _load(truth_match_dir, prefetch_depth)
+    for kwargs in (
+            {},
+            {'filters': ['truth_type == 1', (lambda m: m > 100, 'mag_r')]},
+            {'native_filters': ['tract != 3831']},
+    ):
+        expected = list(sequential.get_quantities(['ra', 'mag_r', 'id'], return_iterator=True, **kwargs))
+        actual = list(prefetched.get_quantities(['ra', 'mag_r', 'id'], return_iterator=True, **kwargs))
+        assert len(actual) == len(expected)
+        for chunk, expected_chunk in zip(actual, expected):
+            assert set(chunk) == set(expected_chunk)
+            for q in chunk:
+                assert_array_equal(chunk[q], expected_chunk[q])
+
+
+def test_prefetch_reads_in_background(truth_match_dir, monkeypatch):
+    """All but the first dataset are read by the background thread"""
+    read_threads = []
+    read_columns = ParquetFileWrapper.read_columns
+
+    def recording_read_columns(self, *args, **kwargs):
+        read_threads.append(threading.current_thread())
+        return read_columns(self, *args, **kwargs)
+
+    monkeypatch.setattr(ParquetFileWrapper, 'read_columns', recording_read_columns)
+    _load(truth_match_dir, 1).get_quantities(['ra'])
+    assert len(read_threads) == len(TRACTS)
+    assert sum(t is threading.current_thread() for t in read_threads) == 1
+
+
+def test_prefetch_early_close(truth_match_dir):
+    """Closing the iterator early stops the read-ahead and leaves the catalog usable"""
+    catalog = _load(truth_match_dir, 2)
+    expected = _load(truth_match_dir, 0).get_quantities(['ra'], return_iterator=True)
+    it = catalog.get_quantities(['ra'], return_iterator=True)
+    assert_array_equal(next(it)['ra'], next(expected)['ra'])
+    it.close()
+    assert_array_equal(catalog['ra'], _load(truth_match_dir, 0)['ra'])
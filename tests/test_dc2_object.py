@@ -4,8 +4,10 @@ Tests for DC2 Object Reader
 import os
 import pytest
 import numpy as np
+import pandas as pd
 from numpy.testing import assert_array_equal
 import GCRCatalogs
+from GCRCatalogs.dc2_object import TableWrapper
 GCRCatalogs.ConfigSource.set_config_source()
 
 # pylint: disable=redefined-outer-name
@@ -54,3 +56,74 @@ def test_get_tract_patch(load_dc2_catalog):
 
     assert_array_equal(tract_col, np.repeat(tract, len(gc)))
     assert_array_equal(patch_col, np.repeat(patch, len(gc)))
+
+
+def _write_hdf5(path, format_type):
+    """A small object table in the given HDF5 format, and the DataFrame written"""
+    n = 50
+    df = pd.DataFrame({
+        'x_flux': np.linspace(0, 1, n),
+        'x_flux_f4': np.linspace(0, 1, n, dtype=np.float32),
+        'x_id': np.arange(n, dtype=np.int64),
+        'x_flag': np.arange(n) % 3 == 0,
+    })
+    df.to_hdf(str(path), key='object_4850_31', format=format_type, mode='w')
+    return df
+
+
+@pytest.fixture(params=['fixed', 'table'])
+def object_hdf5(request, tmp_path):
+    path = tmp_path / 'object_tract_4850.hdf5'
+    df = _write_hdf5(path, request.param)
+    with pd.HDFStore(str(path), 'r') as store:
+        yield TableWrapper(store, 'object_4850_31'), df
+
+
+def test_constant_array_dtype_spellings(object_hdf5):
+    """Constant columns are cached once per dtype, however the dtype is spelled"""
+    table, _ = object_hdf5
+    arrays = [table._generate_constant_array(dtype, np.nan)  # pylint: disable=protected-access
+              for dtype in ('f8', float, np.float64, np.dtype('<f8'))]
+    assert all(array is arrays[0] for array in arrays)
+    assert arrays[0].dtype == np.float64 and len(arrays[0]) == len(table)
+    assert table._generate_constant_array('i8', -1) is table._generate_constant_array(np.int64, -1)  # pylint: disable=protected-access
+    assert table._generate_constant_array('f4', np.nan).dtype == np.float32  # pylint: disable=protected-access
+
+
+def test_table_wrapper_columns(object_hdf5):
+    """Columns read one at a time, or together, match pandas' own reader"""
+    table, df = object_hdf5
+    assert table.columns == set(df.columns)
+    assert len(table) == len(df)
+    for col in df.columns:
+        assert table[col].dtype == df[col].dtype
+        assert_array_equal(table[col], df[col].values)
+
+    table.clear_cache()
+    data = table.read_columns(['x_flag', 'x_flux', 'x_missing'])
+    assert set(data) == {'x_flag', 'x_flux', 'x_missing'}
+    assert_array_equal(data['x_flag'], df['x_flag'].values)
+    assert_array_equal(data['x_flux'], df['x_flux'].values)
+    assert np.isnan(data['x_missing']).all() and len(data['x_missing']) == len(df)
+    assert 'x_missing' not in table
+
+    # cached columns are returned again; fixed-format ones stay writable as before
+    # (table-format columns are writable only if pandas hands out writable arrays)
+    assert table['x_flux'] is table['x_flux']
+    if not table.is_table:
+        assert table['x_flux'].flags.writeable
+    table.clear_cache()
+    assert_array_equal(table['x_id'], df['x_id'].values)
+
+
+def test_table_wrapper_matches_read_hdf(tmp_path):
+    """Every column of a fixed- or table-format file matches pd.read_hdf"""
+    for format_type in ('fixed', 'table'):
+        path = tmp_path / 'object_tract_4850_{}.hdf5'.format(format_type)
+        _write_hdf5(path, format_type)
+        expected = pd.read_hdf(str(path), 'object_4850_31')
+        with pd.HDFStore(str(path), 'r') as store:
+            table = TableWrapper(store, 'object_4850_31')
+            data = table.read_columns(list(expected.columns))
+        for col in expected.columns:
+            assert_array_equal(data[col], expected[col].values)
@@ -0,0 +1,128 @@
+"""
+Tests for DC2 Parquet Photo-z Readers
+"""
+import warnings
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from numpy.testing import assert_array_equal
+from GCR import CompositeCatalog, MATCHING_FORMAT
+
+from GCRCatalogs.dc2_photoz_parquet import DC2PhotozMixin, DC2PhotozCatalog
+from GCRCatalogs.dc2_truth_match import DC2TruthMatchCatalog
+from GCRCatalogs.photoz import _compute_pdf_bin_centers
+
+# pylint: disable=redefined-outer-name
+
+
+class _PhotozBins(DC2PhotozMixin):
+    """Only the bin handling of the photo-z readers, without any files"""
+    def __init__(self, pdf_bin_info=None):
+        self._process_pdf_bins(pdf_bin_info)
+
+
+@pytest.fixture(scope='module')
+def photoz():
+    return _PhotozBins({'start': 0.0, 'stop': 1.0, 'nbins': 11, 'decimals_to_round': 3})
+
+
+@pytest.fixture(scope='module')
+def pdfs():
+    rng = np.random.default_rng(5)
+    pdfs = rng.random((25, 11)).astype(np.float32)
+    pdfs[:, :3] = 0  # no probability below z = 0.3
+    pdfs[4] = 0  # no probability at all
+    pdfs[9] = 0
+    pdfs[9, 7] = 2.5  # all probability in one bin
+    return pdfs
+
+
+def test_sample_photoz_reproducible(photoz, pdfs):
+    """The same seed gives the same redshifts, also for a list of 1d PDFs"""
+    z = photoz.sample_photoz(pdfs, random_state=42)
+    assert_array_equal(z, photoz.sample_photoz(pdfs, random_state=42))
+    assert_array_equal(z, photoz.sample_photoz(list(pdfs), random_state=np.random.default_rng(42)))
+    assert not np.array_equal(z, photoz.sample_photoz(pdfs, random_state=43), equal_nan=True)
+
+
+def test_sample_photoz_within_bins(photoz, pdfs):
+    """Redshifts are bin centers with non-zero probability; NaN if the PDF is all zero"""
+    z = photoz.sample_photoz(pdfs, random_state=1)
+    assert z.shape == (len(pdfs),)
+    assert np.isnan(z[4])
+    assert z[9] == photoz.photoz_pdf_bin_centers[7]
+    finite = np.isfinite(z)
+    assert np.count_nonzero(finite) == len(pdfs) - 1
+    bins = np.searchsorted(photoz.photoz_pdf_bin_centers, z[finite])
+    assert_array_equal(photoz.photoz_pdf_bin_centers[bins], z[finite])
+    assert (pdfs[finite, bins] > 0).all()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 25, 100])
+def test_sample_photoz_chunk_size(photoz, pdfs, chunk_size):
+    """Splitting the galaxies in chunks does not change the result"""
+    assert_array_equal(photoz.sample_photoz(pdfs, random_state=3, chunk_size=chunk_size),
+                       photoz.sample_photoz(pdfs, random_state=3))
+
+
+def test_sample_photoz_wrong_shape(photoz, pdfs):
+    with pytest.raises(ValueError):
+        photoz.sample_photoz(pdfs[:, :-1])
+
+
+def test_pdf_bin_centers_shared():
+    """Readers with the same bin info share one read-only array of bin centers"""
+    info = {'start': 0.005, 'stop': 3.005, 'nbins': 301, 'decimals_to_round': 3}
+    bin_centers = _PhotozBins(dict(info)).photoz_pdf_bin_centers
+    assert bin_centers is _PhotozBins(dict(info)).photoz_pdf_bin_centers
+    assert bin_centers is _compute_pdf_bin_centers(0.005, 3.005, 301, 3)
+    assert not bin_centers.flags.writeable
+    assert_array_equal(bin_centers, np.round(np.linspace(0.005, 3.005, 301), 3))
+
+
+@pytest.fixture(scope='module')
+def photoz_with_main(tmp_path_factory):
+    """Per-tract photo-z files with several row groups, and a main catalog with the same rows"""
+    photoz_dir = tmp_path_factory.mktemp('photoz')
+    main_dir = tmp_path_factory.mktemp('main')
+    rng = np.random.default_rng(7)
+    for tract, n in ((3830, 25), (3831, 10)):
+        galaxy_id = tract * 1000 + np.arange(n)
+        pq.write_table(pa.table({
+            'galaxy_id': galaxy_id,
+            'z_mode': rng.random(n),
+            'pdf': pa.array(list(rng.random((n, 301)).astype(np.float32))),
+        }), str(photoz_dir / 'photoz_pdf_Run2.2i_tract_{}.parquet'.format(tract)), row_group_size=4)
+        pq.write_table(pa.Table.from_pandas(pd.DataFrame({
+            'id': galaxy_id.astype(str),
+            'ra': rng.random(n),
+            'match_objectId': galaxy_id,
+            'is_good_match': np.ones(n, dtype=bool),
+            'truth_type': np.ones(n, dtype=np.int64),
+        }), preserve_index=False), str(main_dir / 'truth_tract{}.parquet'.format(tract)))
+    return str(photoz_dir), str(main_dir)
+
+
+def test_composite_rows_line_up(photoz_with_main):
+    """As a MATCHING_FORMAT add-on, each photo-z chunk pairs with the main catalog's chunk of the same tract"""
+    photoz_dir, main_dir = photoz_with_main
+    photoz = DC2PhotozCatalog(base_dir=photoz_dir)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        composite = CompositeCatalog([DC2TruthMatchCatalog(base_dir=main_dir), photoz],
+                                     ['main', 'photoz'], matching_methods=[None, MATCHING_FORMAT])
+        chunks = list(composite.get_quantities(['id', 'ID', 'photoz_mode'], return_iterator=True))
+
+    assert [len(chunk['id']) for chunk in chunks] == [25, 10]
+    for chunk in chunks:
+        assert_array_equal(chunk['id'].astype(np.int64), chunk['ID'])
+
+    # the opt-in split gives one chunk per row group, for standalone use
+    split = DC2PhotozCatalog(base_dir=photoz_dir, split_row_groups=True)
+    chunks = list(split.get_quantities(['ID', 'photoz_pdf'], return_iterator=True))
+    assert [len(chunk['ID']) for chunk in chunks] == [4] * 6 + [1] + [4, 4, 2]
+    assert_array_equal(np.concatenate([chunk['ID'] for chunk in chunks]),
+                       photoz.get_quantities(['ID'])['ID'])
@@ -0,0 +1,185 @@
+"""
+Tests for DC2 Truth (sqlite / hdf5) Readers
+"""
+import sqlite3
+
+import pytest
+import numpy as np
+import h5py
+from numpy.testing import assert_array_equal
+
+from GCRCatalogs import dc2_truth
+from GCRCatalogs.dc2_truth import (DC2TruthCatalogReader, DC2TruthCatalogLightCurveReader,
+                                   DC2TruthLCSummaryReader)
+
+# pylint: disable=redefined-outer-name
+
+CHUNK_SIZE = 10
+
+
+@pytest.fixture(params=[True, False], ids=['fromiter', 'list'])
+def fromiter_structured(request, monkeypatch):
+    """Run a test both with np.fromiter and with the fallback for numpy < 1.23"""
+    monkeypatch.setattr(dc2_truth, '_FROMITER_STRUCTURED', request.param)
+
+def _write_truth_db(path, n_rows):
+    rng = np.random.default_rng(n_rows)
+    ra = rng.random(n_rows)
+    conn = sqlite3.connect(str(path))
+    conn.execute('CREATE TABLE truth (object_id INTEGER, ra REAL, agn INTEGER);')
+    conn.execute('CREATE TABLE column_descriptions (name TEXT, description TEXT);')
+    conn.executemany('INSERT INTO truth VALUES (?, ?, ?);',
+                     [(i, float(ra[i]), i % 3 == 0) for i in range(n_rows)])
+    conn.commit()
+    conn.close()
+    return np.arange(n_rows), ra
+
+
+def _expected_chunk_sizes(n_rows):
+    # a catalog without any rows still yields one (empty) chunk
+    return [min(CHUNK_SIZE, n_rows - start) for start in range(0, max(n_rows, 1), CHUNK_SIZE)]
+
+
+@pytest.mark.parametrize('n_rows', [0, CHUNK_SIZE - 3, CHUNK_SIZE, 2 * CHUNK_SIZE])
+@pytest.mark.usefixtures('fromiter_structured')
+def test_truth_chunks(tmp_path, n_rows):
+    """Every row is returned once, in chunks of at most `chunk_size` rows, with no trailing empty chunk"""
+    object_id, ra = _write_truth_db(tmp_path / 'truth.db', n_rows)
+    catalog = DC2TruthCatalogReader(filename=str(tmp_path / 'truth.db'), chunk_size=CHUNK_SIZE)
+
+    chunks = list(catalog.get_quantities(['object_id', 'ra', 'agn'], return_iterator=True))
+    assert [len(chunk['ra']) for chunk in chunks] == _expected_chunk_sizes(n_rows)
+
+    data = catalog.get_quantities(['object_id', 'ra', 'agn'])
+    assert_array_equal(data['object_id'], object_id)
+    assert_array_equal(data['ra'], ra)
+    assert data['agn'].dtype == bool
+    assert_array_equal(data['agn'], object_id % 3 == 0)
+
+    data = catalog.get_quantities(['ra'], native_filters=['object_id >= 5'])
+    assert_array_equal(data['ra'], ra[5:])
+
+
+@pytest.mark.usefixtures('fromiter_structured')
+def test_truth_getter_quantities_change(tmp_path):
+    """A getter may be asked for other quantities than for the previous chunk"""
+    object_id, ra = _write_truth_db(tmp_path / 'truth.db', 2 * CHUNK_SIZE + 5)
+    # a covering index, which SQLite scans in `ra` order when only `ra` is selected
+    conn = sqlite3.connect(str(tmp_path / 'truth.db'))
+    conn.execute('CREATE INDEX truth_ra ON truth (ra);')
+    conn.commit()
+    conn.close()
+    catalog = DC2TruthCatalogReader(filename=str(tmp_path / 'truth.db'), chunk_size=CHUNK_SIZE)
+
+    getters = catalog._iter_native_dataset()  # pylint: disable=protected-access
+    assert_array_equal(next(getters)(['ra'])['ra'], ra[:CHUNK_SIZE])
+    chunk = next(getters)(['object_id', 'ra'])
+    assert_array_equal(chunk['object_id'], object_id[CHUNK_SIZE:2*CHUNK_SIZE])
+    assert_array_equal(chunk['ra'], ra[CHUNK_SIZE:2*CHUNK_SIZE])
+    assert_array_equal(next(getters)(['ra'])['ra'], ra[2*CHUNK_SIZE:])
+    assert next(getters, None) is None
+
+
+@pytest.mark.parametrize('chunk_size', [0, -1])
+def test_chunk_size_must_be_positive(tmp_path, chunk_size):
+    _write_truth_db(tmp_path / 'truth.db', 5)
+    with pytest.raises(ValueError):
+        DC2TruthCatalogReader(filename=str(tmp_path / 'truth.db'), chunk_size=chunk_size)
+    with pytest.raises(ValueError):
+        DC2TruthLCSummaryReader(filename=str(tmp_path / 'summary.h5'), chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize('n_rows', [0, CHUNK_SIZE - 3, CHUNK_SIZE, 2 * CHUNK_SIZE])
+def test_lc_summary_chunks(tmp_path, n_rows):
+    """Every row of the summary file is returned once, in chunks of at most `chunk_size` rows"""
+    filename = str(tmp_path / 'summary.h5')
+    with h5py.File(filename, 'w') as f:
+        f['uniqueId'] = np.arange(n_rows)
+        f['ra'] = np.linspace(0, 1, n_rows)
+    catalog = DC2TruthLCSummaryReader(filename=filename, chunk_size=CHUNK_SIZE)
+
+    chunks = list(catalog.get_quantities(['uniqueId', 'ra'], return_iterator=True))
+    assert [len(chunk['ra']) for chunk in chunks] == _expected_chunk_sizes(n_rows)
+
+    data = catalog.get_quantities(['uniqueId', 'ra'])
+    assert_array_equal(data['uniqueId'], np.arange(n_rows))
+    assert_array_equal(data['ra'], np.linspace(0, 1, n_rows))
+
+
+@pytest.fixture(scope='module')
+def light_curve_db(tmp_path_factory):
+    """A small light-curve database, with light curves of very different lengths"""
+    filename = str(tmp_path_factory.mktemp('light_curves') / 'lc.db')
+    rng = np.random.default_rng(3)
+    # no rows for 2 and 8; 5 rows spans several blocks of the reader below
+    n_points = {1: 1, 2: 0, 3: 4, 5: 13, 8: 0, 13: 2}
+    rows = [(uid, int(obshistid), float(rng.random()))
+            for uid, n in n_points.items() for obshistid in rng.choice(50, n, replace=False)]
+    rows = [rows[i] for i in rng.permutation(len(rows))]
+
+    conn = sqlite3.connect(filename)
+    conn.execute('CREATE TABLE light_curves (uniqueId INTEGER, obshistid INTEGER, mag REAL);')
+    conn.execute('CREATE TABLE obs_metadata (obshistid INTEGER, mjd REAL, filter INTEGER);')
+    conn.execute('CREATE TABLE variables_and_transients (uniqueId INTEGER, agn INTEGER);')
+    conn.executemany('INSERT INTO light_curves VALUES (?, ?, ?);', rows)
+    conn.executemany('INSERT INTO obs_metadata VALUES (?, ?, ?);',
+                     [(i, 59580.0 + i, i % 6) for i in range(50)])
+    conn.executemany('INSERT INTO variables_and_transients VALUES (?, ?);',
+                     [(uid, uid % 2) for uid in n_points])
+    conn.commit()
+    conn.close()
+    return filename
+
+
+def _light_curve_per_id(filename, uid):
+    """Read one light curve with its own query, sorted by obshistid"""
+    conn = sqlite3.connect(filename)
+    rows = conn.execute('SELECT light_curves.obshistid, mag, mjd FROM light_curves JOIN obs_metadata '
+                        'ON light_curves.obshistid=obs_metadata.obshistid '
+                        'WHERE light_curves.uniqueId = ? ORDER BY light_curves.obshistid;', (uid,)).fetchall()
+    conn.close()
+    return np.array(rows, dtype=[('obshistid', 'i8'), ('mag', 'f8'), ('mjd', 'f8')])
+
+
+@pytest.mark.parametrize('block_size', [1, 4, 100])
+@pytest.mark.parametrize('native_filters', [None, ['agn = 1']])
+def test_light_curves_match_per_id_query(light_curve_db, block_size, native_filters):
+    """The streamed light curves match reading each one with its own query"""
+    catalog = DC2TruthCatalogLightCurveReader(filename=light_curve_db)
+    catalog._block_size = block_size  # pylint: disable=protected-access
+    expected_ids = [1, 3, 5, 13] if native_filters else [1, 2, 3, 5, 8, 13]
+
+    light_curves = list(catalog.get_quantities(['uniqueId', 'obshistid', 'mag', 'mjd'],
+                                               native_filters=native_filters, return_iterator=True))
+    assert len(light_curves) == len(expected_ids)
+    for uid, light_curve in zip(expected_ids, light_curves):
+        order = np.argsort(light_curve['obshistid'])
+        expected = _light_curve_per_id(light_curve_db, uid)
+        assert_array_equal(light_curve['uniqueId'], np.repeat(uid, len(expected)))
+        for q in ('obshistid', 'mag', 'mjd'):
+            assert_array_equal(light_curve[q][order], expected[q])
+
+
+def test_light_curve_getter_quantities_change(light_curve_db):
+    """A getter may be asked for other quantities than for the previous light curve"""
+    catalog = DC2TruthCatalogLightCurveReader(filename=light_curve_db)
+    catalog._block_size = 2  # pylint: disable=protected-access
+    getters = catalog._iter_native_dataset()  # pylint: disable=protected-access
+    for i, (uid, getter) in enumerate(zip([1, 2, 3, 5, 8, 13], getters)):
+        quantities = ['obshistid', 'mag'] if i % 2 else ['mag']
+        light_curve = np.sort(getter(quantities), order='mag')
+        expected = np.sort(_light_curve_per_id(light_curve_db, uid), order='mag')
+        assert_array_equal(light_curve['mag'], expected['mag'])
+        if i % 2:
+            assert_array_equal(light_curve['obshistid'], expected['obshistid'])
+
+
+def test_light_curves_early_close(light_curve_db):
+    """Closing the iterator early stops the read-ahead and leaves the catalog usable"""
+    catalog = DC2TruthCatalogLightCurveReader(filename=light_curve_db)
+    catalog._block_size = 2  # pylint: disable=protected-access
+    it = catalog.get_quantities(['mag'], return_iterator=True)
+    next(it)
+    it.close()
+    light_curves = list(catalog.get_quantities(['mag'], return_iterator=True))
+    assert [len(lc['mag']) for lc in light_curves] == [1, 0, 4, 13, 0, 2]
@@ -0,0 +1,131 @@
+"""
+Tests for DC2 Truth-Match Reader
+"""
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from numpy.testing import assert_array_equal
+
+from GCRCatalogs.dc2_truth_match import DC2TruthMatchCatalog
+from GCRCatalogs.parquet import ParquetFileWrapper
+from GCRCatalogs.dc2_matched_table import _get_galaxy_array, _get_star_array
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture(scope='module')
+def truth_match_tables(tmp_path_factory):
+    """Two small truth-match tract files, and the tables written to them"""
+    base_dir = tmp_path_factory.mktemp('truth_match')
+    rng = np.random.default_rng(11)
+    tables = {}
+    for tract, (n_matched, n_unmatched) in {3830: (700, 900), 3831: (0, 400)}.items():
+        n = n_matched + n_unmatched
+        df = pd.DataFrame({
+            'id': np.arange(n).astype(str),
+            'ra': rng.random(n),
+            'dec': rng.random(n),
+            'redshift': rng.random(n).astype(np.float32),
+            'flux_r': rng.random(n).astype(np.float32),
+            'flux_r_noMW': rng.random(n).astype(np.float32),
+            'truth_type': rng.integers(1, 4, n),
+            'match_objectId': np.concatenate([np.arange(n_matched), np.full(n_unmatched, -1)]),
+            'match_sep': rng.random(n),
+            'is_good_match': rng.random(n) < 0.5,
+            'is_nearest_neighbor': rng.random(n) < 0.5,
+            'is_unique_truth_entry': rng.random(n) < 0.5,
+        })
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False),
+                       str(base_dir / 'truth_tract{}.parquet'.format(tract)), row_group_size=250)
+        tables[tract] = df
+    return str(base_dir), pd.concat([tables[t] for t in sorted(tables)], ignore_index=True)
+
+
+def test_matchdc2_masks(truth_match_tables):
+    """`<col>_galaxy` and `<col>_star` hide every row that is not a matched galaxy or star"""
+    base_dir, table = truth_match_tables
+    catalog = DC2TruthMatchCatalog(base_dir=base_dir, as_matchdc2_schema=True)
+    data = catalog.get_quantities(['ra_galaxy', 'ra_star', 'galaxy_match_mask', 'star_match_mask'])
+
+    matched = table[table.match_objectId > -1]
+    is_galaxy = (matched.truth_type.values == 1) & matched.is_good_match.values
+    is_star = (matched.truth_type.values == 2) & matched.is_good_match.values
+    assert_array_equal(data['galaxy_match_mask'], is_galaxy)
+    assert_array_equal(data['star_match_mask'], is_star)
+    assert_array_equal(data['ra_galaxy'].mask, ~is_galaxy)
+    assert_array_equal(data['ra_star'].mask, ~is_star)
+    assert_array_equal(data['ra_galaxy'].compressed(), matched.ra.values[is_galaxy])
+    assert_array_equal(data['ra_star'].compressed(), matched.ra.values[is_star])
+
+    # DC2MatchedTable, whose columns this schema recreates, masks the same rows
+    star_flag = matched.truth_type.values > 1
+    good_match = matched.is_good_match.values
+    assert_array_equal(_get_galaxy_array(matched.ra.values, star_flag, good_match).mask, ~is_galaxy)
+    assert_array_equal(_get_star_array(matched.ra.values, star_flag, good_match).mask,
+                       ~(star_flag & good_match))
+
+
+@pytest.mark.parametrize('write_statistics', [True, False])
+def test_count_rows(tmp_path, write_statistics):
+    """Counting from row-group statistics agrees with counting every row"""
+    # row groups of 4: all matched, mixed, none matched, and a partial last one
+    match_object_id = np.array([5, 6, 7, 8, 9, -1, 10, -1, -1, -1, -1, -1, 11, -1])
+    is_good_match = np.array([True] * 4 + [False, True, True, False] + [False] * 4 + [True, True])
+    table = pa.table({'match_objectId': match_object_id, 'is_good_match': is_good_match})
+    path = str(tmp_path / 'truth_tract3830.parquet')
+    pq.write_table(table, path, row_group_size=4, write_statistics=write_statistics)
+
+    dataset = ParquetFileWrapper(path)
+    row_groups_read = []
+    read_columns_row_group = dataset.read_columns_row_group
+
+    def recording_read_columns_row_group(columns, as_dict=False, row_group=None):
+        row_groups_read.append(row_group)
+        return read_columns_row_group(columns, as_dict=as_dict, row_group=row_group)
+
+    dataset.read_columns_row_group = recording_read_columns_row_group
+    count = DC2TruthMatchCatalog._count_rows  # pylint: disable=protected-access
+
+    assert count(dataset, 'match_objectId', lambda v: v > -1) == np.count_nonzero(match_object_id > -1)
+    # only row groups whose min/max do not decide the predicate are read
+    assert row_groups_read == ([1, 3] if write_statistics else [0, 1, 2, 3])
+
+    del row_groups_read[:]
+    assert count(dataset, 'is_good_match', lambda v: np.asarray(v, dtype=bool)) == np.count_nonzero(is_good_match)
+    assert row_groups_read == ([1] if write_statistics else [0, 1, 2, 3])
+
+
+def test_len(truth_match_tables):
+    """len() matches the number of rows returned, for every reader option"""
+    base_dir, table = truth_match_tables
+    for kwargs, n_rows in (
+            ({}, len(table)),
+            ({'as_object_addon': True}, np.count_nonzero(table.match_objectId > -1)),
+            ({'as_truth_table': True}, np.count_nonzero(table.is_unique_truth_entry)),
+    ):
+        catalog = DC2TruthMatchCatalog(base_dir=base_dir, **kwargs)
+        assert len(catalog) == n_rows
+        assert len(catalog.get_quantities(['truth_type'])['truth_type']) == n_rows
+
+
+@pytest.mark.parametrize('option', ['as_object_addon', 'as_truth_table'])
+def test_filtered_read_matches_mask(truth_match_tables, option):
+    """Pushing the row filter into the parquet read gives the rows that masking after the read gives"""
+    base_dir = truth_match_tables[0]
+    catalog = DC2TruthMatchCatalog(base_dir=base_dir, **{option: True})
+    columns = ['id', 'ra', 'flux_r', 'truth_type', 'match_objectId', 'is_unique_truth_entry']
+    for dataset in catalog._datasets:  # pylint: disable=protected-access
+        data = catalog._obtain_native_data_dict(set(columns), dataset)  # pylint: disable=protected-access
+        full = dataset.read_columns(columns, as_dict=True)
+        if option == 'as_object_addon':
+            # the matched rows come first
+            n_matched = np.count_nonzero(full['match_objectId'] > -1)
+            expected = {c: full[c][:n_matched] for c in columns}
+        else:
+            expected = {c: full[c][full['is_unique_truth_entry']] for c in columns}
+        assert set(data) == set(columns)
+        for c in columns:
+            assert data[c].dtype == expected[c].dtype
+            assert_array_equal(data[c], expected[c])
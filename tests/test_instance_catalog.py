@@ -0,0 +1,61 @@
+"""
+Tests for Instance Catalog Reader
+"""
+import numpy as np
+import pandas as pd
+
+from GCRCatalogs.instance_catalog import InstanceCatalog
+
+OBJ_TYPES = ('star', 'knots', 'bulge_gal', 'disk_gal')
+ROWS = 1000
+
+
+def _load_catalog(tmp_path, cache_bytes):
+    """An InstanceCatalog whose object tables are made up, and a list of the tables it loaded"""
+    header_file = tmp_path / 'phosim_cat_1.txt'
+    header_file.write_text('obshistid 1\n' + ''.join(
+        'includeobj {}_cat_1.txt.gz\n'.format(obj_type) for obj_type in OBJ_TYPES
+    ))
+    for obj_type in OBJ_TYPES:
+        (tmp_path / '{}_cat_1.txt.gz'.format(obj_type)).touch()
+
+    catalog = InstanceCatalog(header_file=str(header_file), cache_bytes=cache_bytes)
+    loaded = []
+
+    def load_table(obj_type):
+        loaded.append(obj_type)
+        return pd.DataFrame({'id': np.arange(ROWS), 'ra': np.zeros(ROWS)})
+
+    catalog._load_single_catalog = load_table  # pylint: disable=protected-access
+    return catalog, loaded
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Tables past `cache_bytes` evict the least recently used ones"""
+    table_bytes = int(pd.DataFrame({'id': np.arange(ROWS), 'ra': np.zeros(ROWS)}).memory_usage().sum())
+    catalog, loaded = _load_catalog(tmp_path, cache_bytes=2 * table_bytes)
+
+    catalog.load_single_catalog('star')
+    catalog.load_single_catalog('knots')
+    catalog.load_single_catalog('star')  # now 'knots' is the least recently used
+    catalog.load_single_catalog('bulge_gal')
+    assert list(catalog._data) == ['star', 'bulge_gal']  # pylint: disable=protected-access
+
+    catalog.load_single_catalog('star')
+    catalog.load_single_catalog('knots')
+    assert list(catalog._data) == ['star', 'knots']  # pylint: disable=protected-access
+    assert loaded == ['star', 'knots', 'bulge_gal', 'knots']
+
+
+def test_cache_keeps_table_larger_than_budget(tmp_path):
+    """A table larger than `cache_bytes` is still returned, and kept until the next one is loaded"""
+    catalog, loaded = _load_catalog(tmp_path, cache_bytes=100)
+
+    star = catalog.load_single_catalog('star')
+    assert len(star) == ROWS
+    assert catalog.load_single_catalog('star') is star
+    assert list(catalog._data) == ['star']  # pylint: disable=protected-access
+
+    catalog.load_single_catalog('knots')
+    assert list(catalog._data) == ['knots']  # pylint: disable=protected-access
+    assert loaded == ['star', 'knots']
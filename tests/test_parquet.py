@@ -0,0 +1,59 @@
+"""
+Tests for the Parquet file wrapper
+"""
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from GCRCatalogs.parquet import ParquetFileWrapper
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture(scope='module')
+def parquet_file(tmp_path_factory):
+    """A parquet file with one column of each kind, spread over two row groups"""
+    path = str(tmp_path_factory.mktemp('parquet') / 'columns.parquet')
+    table = pa.table({
+        'int': pa.array(np.arange(6)),
+        'float': pa.array(np.arange(6, dtype=np.float32)),
+        'bool': pa.array([True, False] * 3),
+        'int_null': pa.array([1, None, 3, 4, 5, 6]),
+        'bool_null': pa.array([True, None, False, True, True, True]),
+        'string': pa.array(list('abcdef')),
+        'string_null': pa.array(['a', None, 'c', 'd', 'e', 'f']),
+        'category': pa.array(list('aabbcc')).dictionary_encode(),
+        'timestamp': pa.array(pd.date_range('2020-01-01', periods=6, freq='D')),
+    })
+    pq.write_table(table, path, row_group_size=4)
+    return path, table.column_names
+
+
+@pytest.mark.parametrize('row_group', [None, 0])
+def test_as_dict_matches_dataframe(parquet_file, row_group):
+    """`as_dict=True` returns what `DataFrame[col].values` returns, with writable numeric arrays"""
+    path, columns = parquet_file
+    dataset = ParquetFileWrapper(path)
+    if row_group is None:
+        data = dataset.read_columns(columns, as_dict=True)
+        df = dataset.read_columns(columns, as_dict=False)
+    else:
+        data = dataset.read_columns_row_group(columns, as_dict=True, row_group=row_group)
+        df = dataset.read_columns_row_group(columns, as_dict=False, row_group=row_group)
+
+    assert list(data) == columns
+    for col in columns:
+        expected = df[col].values
+        assert type(data[col]) is type(expected)
+        assert data[col].dtype == expected.dtype
+        pd.testing.assert_series_equal(pd.Series(data[col]), pd.Series(expected))
+
+    assert data['int'].dtype == np.int64
+    assert data['float'].dtype == np.float32
+    assert data['bool'].dtype == bool
+    assert data['int_null'].dtype == np.float64
+    assert isinstance(data['category'], pd.Categorical)
+    for col in ('int', 'float', 'bool'):
+        assert data[col].flags.writeable